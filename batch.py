@@ -0,0 +1,104 @@
+"""Batch coding of supplier descriptions from a pandas Series or a CSV/XLSX file.
+
+Usage:
+
+    python batch.py purchase_orders.xlsx --column Description -o coded.csv
+    python batch.py purchase_orders.xlsx --column Description -o coded.csv --workers 0
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from core import DEFAULT_ATTRIBUTES, extract_attributes
+from parallel import DEFAULT_CHUNK_SIZE, imap_chunks
+
+PRODUCT_CODE_COLUMN = "Product code"
+
+
+def code_unique(texts):
+    """Code a list of distinct descriptions; returns a DataFrame in the same order."""
+    results = [extract_attributes(text) for text in texts]
+    columns = {attribute: [attributes[attribute][0] for attributes, _ in results]
+               for attribute in DEFAULT_ATTRIBUTES}
+    columns[PRODUCT_CODE_COLUMN] = [product_code for _, product_code in results]
+    return pd.DataFrame(columns, dtype=object)
+
+
+def code_series(descriptions, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Code a Series of supplier descriptions.
+
+    Returns a DataFrame on the same index with one label column per attribute
+    plus the product code, matching ``extract_attributes`` row for row.
+    Duplicate descriptions are only coded once. With ``workers`` other than 1
+    the distinct descriptions are coded in chunks on a process pool
+    (``None`` uses every core).
+    """
+    text = pd.Series(descriptions).fillna("").astype(str)
+    positions, uniques = pd.factorize(text)
+
+    if workers == 1:
+        coded = code_unique(uniques)
+    else:
+        parts = list(imap_chunks(code_unique, uniques.tolist(), workers, chunk_size))
+        coded = pd.concat(parts, ignore_index=True) if parts else code_unique([])
+    coded = coded.take(positions)
+    coded.index = text.index
+    return coded
+
+
+def check_file_type(path):
+    """ValueError for a legacy .xls file; only .xlsx has an installed Excel engine (openpyxl)."""
+    if os.path.splitext(path)[1].lower() == ".xls":
+        raise ValueError(f"{path}: legacy .xls files are not supported, save the sheet as .xlsx or .csv")
+
+
+def read_descriptions(path, column=None):
+    """Read the description column of a CSV or Excel file as a Series."""
+    check_file_type(path)
+    if os.path.splitext(path)[1].lower() == ".xlsx":
+        frame = pd.read_excel(path, usecols=[column] if column else None, dtype=str)
+    else:
+        frame = pd.read_csv(path, usecols=[column] if column else None, dtype=str)
+    return frame[column] if column else frame.iloc[:, 0]
+
+
+def code_file(path, column=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Code every description of a CSV or Excel file."""
+    descriptions = read_descriptions(path, column)
+    return pd.concat([descriptions, code_series(descriptions, workers, chunk_size)], axis=1)
+
+
+def write_coded(frame, path):
+    check_file_type(path)
+    if os.path.splitext(path)[1].lower() == ".xlsx":
+        frame.to_excel(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate product codes for a file of supplier descriptions.")
+    parser.add_argument("input", help="CSV or XLSX file with supplier descriptions")
+    parser.add_argument("-c", "--column", help="description column (default: first column)")
+    parser.add_argument("-o", "--output", help="CSV or XLSX file to write (default: stdout as CSV)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every core (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="distinct descriptions per worker task (default: %(default)s)")
+    args = parser.parse_args()
+    for path in filter(None, (args.input, args.output)):
+        try:
+            check_file_type(path)
+        except ValueError as error:
+            parser.error(str(error))
+
+    coded = code_file(args.input, args.column, args.workers or None, args.chunk_size)
+    if args.output:
+        write_coded(coded, args.output)
+    else:
+        print(coded.to_csv(index=False), end="")
+
+
+if __name__ == "__main__":
+    main()
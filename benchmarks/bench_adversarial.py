@@ -0,0 +1,120 @@
+"""Worst-case latency of the voltage rules on adversarial descriptions.
+
+Run from the repository root:
+
+    python benchmarks/bench_adversarial.py
+    python benchmarks/bench_adversarial.py --sizes 1000 10000 100000
+    python benchmarks/bench_adversarial.py --fuzz 2000 --seed 1
+
+Each family of pathological supplier text is generated at growing sizes.
+For every size the script reports the total time of primary_voltage_kv and
+the slowest single rule; time should grow roughly linearly with the size.
+
+With ``--fuzz`` random strings are built from the fragments the rules
+backtrack on, and the worst latency seen per rule is reported together with
+the worst end-to-end time of extract_attributes and its guarded variant.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import (  # noqa: E402
+    VOLTAGE_PATTERNS,
+    extract_attributes,
+    extract_attributes_guarded,
+    offender_logger,
+    primary_voltage_kv,
+    shorten_whitespace_runs,
+)
+
+FAMILIES = {
+    "digit run": lambda n: "1" * n + " x",
+    "space run": lambda n: "1" + " " * n + "x kV",
+    "two space runs": lambda n: "1" + " " * (n // 2) + "2" + " " * (n // 2) + "V",
+    "V before kV": lambda n: "1 V " * (n // 4) + "kV",
+    "number list": lambda n: "1/" * (n // 2),
+    "spaced numbers": lambda n: "1 " * (n // 2) + "x V",
+    "colon run": lambda n: "Pri" + ":" * n + "1 V",
+    "dotted digits": lambda n: "1." * (n // 2) + "x10^2V",
+    "kV pairs": lambda n: "10 / 20 kV " * (n // 11),
+    "words": lambda n: "transformer V " * (n // 14),
+}
+
+
+FRAGMENTS = [
+    "1", "12", "1234", "0,4", "6.6", "1e3", " ", "   ", "\t", "\n", "/", "-", "~", "to", "x", "×", "10^",
+    "V", "v", "kV", "KV", "volts", "Hz", "Pri", "Max", "Sec:", "Min", "HV", "Primary", "[V]", "[kV]",
+    "±", ":", "(", ")", ",", ".", "kVA", "MVA",
+]
+
+
+def fuzz_text(rng, max_length):
+    parts, length = [], 0
+    target = rng.randint(1, max_length)
+    while length < target:
+        fragment = rng.choice(FRAGMENTS) * rng.choice([1, 1, 1, 2, 8, 64])
+        parts.append(fragment)
+        length += len(fragment)
+    return "".join(parts)[:max_length]
+
+
+def fuzz(count, seed, max_length):
+    rng = random.Random(seed)
+    worst_rule = [(0.0, "") for _ in VOLTAGE_PATTERNS]
+    worst_plain = worst_guarded = (0.0, "")
+    for _ in range(count):
+        text = fuzz_text(rng, max_length)
+        shortened = shorten_whitespace_runs(text)
+        for index, (pattern, _, _) in enumerate(VOLTAGE_PATTERNS):
+            worst_rule[index] = max(worst_rule[index], (timed(pattern.search, shortened), text))
+        worst_plain = max(worst_plain, (timed(extract_attributes, text), text))
+        worst_guarded = max(worst_guarded, (timed(extract_attributes_guarded, text), text))
+
+    print(f"{'rule':<6}{'worst ms':>10}  pattern")
+    for index, ((pattern, _, _), (seconds, _)) in enumerate(zip(VOLTAGE_PATTERNS, worst_rule)):
+        print(f"{'#' + str(index + 1):<6}{seconds * 1e3:>10.3f}  {pattern.pattern[:70]}")
+    for name, (seconds, text) in (("extract_attributes", worst_plain), ("extract_attributes_guarded", worst_guarded)):
+        print(f"worst {name}: {seconds * 1e3:.3f} ms on {len(text)} chars: {text[:60]!r}")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def slowest_rule(text):
+    text = shorten_whitespace_runs(text)
+    timings = [(timed(pattern.search, text), index) for index, (pattern, _, _) in enumerate(VOLTAGE_PATTERNS)]
+    return max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--fuzz", type=int, metavar="COUNT", help="run COUNT random adversarial strings instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-length", type=int, default=8192, help="longest fuzzed string")
+    args = parser.parse_args()
+
+    if args.fuzz:
+        # Guarded runs log every cut or timed-out input; only the timings matter here.
+        offender_logger.disabled = True
+        fuzz(args.fuzz, args.seed, args.max_length)
+        return
+
+    print(f"{'family':<16}{'size':>8}{'total ms':>11}{'slowest rule':>14}{'rule ms':>10}")
+    for name, generate in FAMILIES.items():
+        for size in args.sizes:
+            text = generate(size)
+            total = timed(primary_voltage_kv, text)
+            rule_time, rule = slowest_rule(text)
+            print(f"{name:<16}{size:>8}{total * 1e3:>11.2f}{'#' + str(rule + 1):>14}{rule_time * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
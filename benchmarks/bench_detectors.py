@@ -0,0 +1,115 @@
+"""Micro-benchmark of per-call detector latency.
+
+Run from the repository root:
+
+    python benchmarks/bench_detectors.py
+    python benchmarks/bench_detectors.py --baseline HEAD~1
+
+With ``--baseline`` the whole tree of that git revision is exported with
+``git archive`` and its extraction code (``core.py``, or ``backend.py`` before
+the split) is timed in a separate interpreter, so the baseline numbers never
+mix in modules of the working tree.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLES = [
+    "Oil Distribution Transformer - 2300kVA - 10kV/0.4kV - 60Hz -AL-ONAN-IEC",
+    "Cast resin dry type transformer 1600 kVA 20/0.4 kV AN indoor Cu winding",
+    "Power transformer 40 MVA 132/33 kV ONAF OLTC outdoor IEC 60076",
+    "XFMR 500kVA 13.8kV/480V KNAN FR3 ANSI C57 aluminum",
+    "Trafo 6,3 kV ± 2 x 2,5 % / 330 V offshore marine",
+    "Software license for automation control system",
+]
+
+DETECTORS = [
+    "detect_oil_type",
+    "detect_application_type",
+    "detect_tap_changer",
+    "extract_primary_voltage",
+    "extract_attributes",
+]
+
+
+def export_revision(revision, directory):
+    """Extract the whole tree of a git revision into ``directory``."""
+    archive = subprocess.run(["git", "archive", "--format=tar", revision], cwd=ROOT, capture_output=True)
+    if archive.returncode != 0:
+        sys.exit(archive.stderr.decode(errors="replace").strip())
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(directory, filter="data")
+
+
+def measure(directory, number):
+    """Per-call latencies of the tree in ``directory``, timed in a fresh interpreter.
+
+    The tree's own core.py (or backend.py before the split) and everything it
+    imports come from ``directory`` only, never from the working tree.
+    """
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", directory, "--number", str(number)],
+        cwd=directory, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure_here(directory, number):
+    sys.path.insert(0, directory)
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = importlib.import_module("core" if os.path.exists(os.path.join(directory, "core.py")) else "backend")
+    print(json.dumps({name: per_call_us(getattr(module, name), number)
+                      for name in DETECTORS if hasattr(module, name)}))
+
+
+def per_call_us(func, number):
+    def run():
+        for text in SAMPLES:
+            func(text)
+    # extract_primary_voltage prints every hit; keep that out of the timing.
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = min(timeit.repeat(run, number=number, repeat=5))
+    return best / (number * len(SAMPLES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("-n", "--number", type=int, default=200)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)  # internal: time the tree in this directory
+    args = parser.parse_args()
+
+    if args.measure:
+        measure_here(args.measure, args.number)
+        return
+
+    current = measure(ROOT, args.number)
+    baseline = None
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            export_revision(args.baseline, directory)
+            baseline = measure(directory, args.number)
+
+    header = f"{'detector':<26}{'current us':>12}"
+    if baseline:
+        header += f"{'baseline us':>13}{'speedup':>9}"
+    print(header)
+    for name, now in current.items():
+        line = f"{name:<26}{now:>12.2f}"
+        if baseline and name in baseline:
+            before = baseline[name]
+            line += f"{before:>13.2f}{before / now:>8.1f}x"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start cost of importing each module.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --top 10
+
+Every module is imported in a fresh interpreter, several times, and the
+median wall time and peak RSS of the import are reported. ``core`` should
+start far faster and smaller than ``backend``, which pulls in Streamlit. With
+``--top`` the slowest imports behind each module are listed, as measured by
+``python -X importtime``.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["core", "cache", "parallel", "streaming", "batch", "backend"]
+
+PROBE = """
+import resource, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def import_cost(module):
+    """Seconds and peak RSS in KiB (Linux) of importing ``module`` cold."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(output[0]), int(output[1])
+
+
+def slowest_imports(module, top):
+    """The ``top`` imports with the largest self time, as (microseconds, name)."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="list the N slowest imports per module")
+    args = parser.parse_args()
+
+    print(f"{'module':<12}{'import ms':>12}{'peak RSS MiB':>15}")
+    for module in args.modules:
+        runs = [import_cost(module) for _ in range(args.repeat)]
+        seconds = statistics.median(run[0] for run in runs)
+        rss = statistics.median(run[1] for run in runs)
+        print(f"{module:<12}{seconds * 1000:>12.1f}{rss / 1024:>15.1f}")
+        for self_us, name in slowest_imports(module, args.top):
+            print(f"    {self_us / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
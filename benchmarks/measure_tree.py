@@ -0,0 +1,54 @@
+"""Throughput of one source tree, timed in its own interpreter.
+
+    python benchmarks/measure_tree.py TREE --repeat 3 < corpus.json
+
+run_benchmarks.py runs this for the working tree and, with --compare, for a
+git revision exported with git archive. TREE is the only repository
+directory on sys.path, so every module imported comes from that tree. The
+corpus is a JSON list of descriptions on stdin; the best descriptions/second
+of each coding mode the tree has is printed as JSON.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+
+def best_rate(func, corpus, repeat):
+    """Best descriptions/second over ``repeat`` runs of ``func(corpus)``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(corpus)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tree", help="repository directory to import the coder from")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = json.load(sys.stdin)
+    sys.path.insert(0, os.path.abspath(args.tree))
+    # Old revisions print while coding, and had the coder in backend.py
+    with contextlib.redirect_stdout(io.StringIO()):
+        if os.path.exists(os.path.join(args.tree, "core.py")):
+            from core import extract_attributes
+        else:
+            from backend import extract_attributes
+        rates = {"extract_attributes": best_rate(lambda texts: [extract_attributes(text) for text in texts],
+                                                 corpus, args.repeat)}
+        if os.path.exists(os.path.join(args.tree, "batch.py")):
+            import pandas as pd
+            from batch import code_series
+            rates["batch.code_series"] = best_rate(lambda texts: code_series(pd.Series(texts)), corpus, args.repeat)
+    print(json.dumps(rates))
+
+
+if __name__ == "__main__":
+    main()
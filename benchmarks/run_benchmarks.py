@@ -0,0 +1,223 @@
+"""Throughput, memory and correctness benchmark for product coding.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --compare HEAD~1
+    python benchmarks/run_benchmarks.py --update-baseline
+
+Output stability is checked against the golden corpus (golden_corpus.jsonl),
+a characterization snapshot of supplier descriptions with the attributes and
+product code the coder produced when the snapshot was taken. It records
+behaviour, not ground truth: rows the coder is known to get wrong carry a
+``known_issue`` note and are listed separately, and the reported figure is
+agreement with the snapshot rather than accuracy. Throughput and peak memory
+are measured on a seeded synthetic corpus, throughput in a fresh interpreter
+per tree (measure_tree.py).
+
+The script exits with status 1 when any golden row changes or agreement drops
+below baseline.json. Throughput only gates with ``--compare REV``: that git
+revision is exported and measured in the same run on the same machine, and a
+drop of more than the tolerance relative to it fails. The throughput stored
+in baseline.json is a record of one machine and never gates.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from batch import code_series  # noqa: E402
+from bench_detectors import export_revision  # noqa: E402
+from core import DEFAULT_ATTRIBUTES, extract_attributes  # noqa: E402
+
+ROOT = os.path.dirname(HERE)
+GOLDEN_PATH = os.path.join(HERE, "golden_corpus.jsonl")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+MEASURE_SCRIPT = os.path.join(HERE, "measure_tree.py")
+
+PRODUCTS = ["Transformer", "Power transformer", "Distribution transformer", "Trafo", "XFMR",
+            "Cast resin transformer", "Dry type transformer", "MV switchgear", "E-House", "Auxiliary transformer"]
+POWERS = ["160 kVA", "630kVA", "1600 kVA", "2,5 MVA", "10 MVA", "40 MVA", "100MVA", "315 MVA", "500 kW"]
+VOLTAGES = ["11/0.4 kV", "20kV/0.4kV", "33 kV - 11 kV", "132/33 kV", "400/220 kV", "13800V/480V",
+            "6,6 kV ± 2x2,5% / 0,4 kV", "Primary 14400V", "HV 690 V", "66 kV", "Pri: 22 kV / Sec: 0.4 kV"]
+EXTRAS = ["ONAN", "ONAF", "ODAF", "KNAN", "AN", "AF", "FR3", "OLTC", "DETC", "off-load", "on load tap changer",
+          "indoor", "outdoor", "marine", "atex", "offshore", "onshore", "IEC 60076", "ANSI", "IEEE", "GOST",
+          "CSA", "copper winding", "Al", "Cu", "50Hz", "60 Hz", "Dyn11", "YNd1", "with accessories"]
+
+
+def load_golden(path=GOLDEN_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_corpus(size, seed=0):
+    """Deterministic supplier-like descriptions, about one in ten repeated."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        if corpus and rng.random() < 0.1:
+            corpus.append(rng.choice(corpus))
+            continue
+        parts = [rng.choice(PRODUCTS), rng.choice(POWERS), rng.choice(VOLTAGES)]
+        parts += rng.sample(EXTRAS, rng.randint(0, 5))
+        corpus.append(rng.choice([" - ", " ", ", "]).join(parts))
+    return corpus
+
+
+def agreement(golden):
+    """Share of golden rows where each attribute, and the full code, match the snapshot."""
+    hits = dict.fromkeys(DEFAULT_ATTRIBUTES, 0)
+    exact = 0
+    failures = []
+    for row in golden:
+        attributes, product_code = extract_attributes(row["description"])
+        for attribute, expected in row["attributes"].items():
+            hits[attribute] += list(attributes[attribute]) == expected
+        if product_code == row["product_code"]:
+            exact += 1
+        else:
+            failures.append((row["description"], row["product_code"], product_code))
+    scores = {attribute: count / len(golden) for attribute, count in hits.items()}
+    scores["Product code"] = exact / len(golden)
+    return scores, failures
+
+
+def throughput(tree, corpus, repeat):
+    """Best descriptions/second per coding mode of the coder in ``tree`` (see measure_tree.py)."""
+    output = subprocess.run([sys.executable, MEASURE_SCRIPT, tree, "--repeat", str(repeat)],
+                            input=json.dumps(corpus), capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def code_loop(corpus):
+    return [extract_attributes(text) for text in corpus]
+
+
+def code_batch(corpus):
+    return code_series(pd.Series(corpus))
+
+
+def peak_memory_kib(func, corpus):
+    tracemalloc.start()
+    try:
+        func(corpus)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run(size, repeat, seed, revision=None):
+    """Benchmark the working tree and, with ``revision``, that git revision in the same run."""
+    corpus = synthetic_corpus(size, seed)
+    scores, failures = agreement(load_golden())
+    result = {
+        "python": platform.python_version(),
+        "corpus_size": size,
+        "descriptions_per_second": throughput(ROOT, corpus, repeat),
+        "peak_memory_kib": {
+            "extract_attributes": peak_memory_kib(code_loop, corpus),
+            "batch.code_series": peak_memory_kib(code_batch, corpus),
+        },
+        "agreement": scores,
+    }
+    if revision:
+        with tempfile.TemporaryDirectory() as directory:
+            export_revision(revision, directory)
+            result["reference"] = {"revision": revision,
+                                   "descriptions_per_second": throughput(directory, corpus, repeat)}
+    return result, failures
+
+
+def compare(result, baseline, tolerance):
+    """Regression messages of ``result``: throughput against its same-run reference, agreement against ``baseline``."""
+    problems = []
+    reference = result.get("reference")
+    if reference:
+        for mode, rate in result["descriptions_per_second"].items():
+            before = reference["descriptions_per_second"].get(mode)
+            if before and rate < before * (1 - tolerance):
+                problems.append(f"{mode}: {rate:,.0f} desc/s is {1 - rate / before:.0%} below "
+                                f"{reference['revision']} ({before:,.0f} desc/s in this run)")
+    if baseline:
+        for attribute, score in result["agreement"].items():
+            before = baseline["agreement"].get(attribute, 0)
+            if score < before:
+                problems.append(f"{attribute}: agreement {score:.1%} below baseline {before:.1%}")
+    return problems
+
+
+def report(result, baseline):
+    print(f"Synthetic corpus: {result['corpus_size']} descriptions")
+    reference = result.get("reference")
+    for mode, rate in result["descriptions_per_second"].items():
+        line = f"  {mode:<20}{rate:>12,.0f} desc/s{result['peak_memory_kib'][mode]:>12,.0f} KiB peak"
+        if reference:
+            before = reference["descriptions_per_second"].get(mode)
+            line += (f"   ({reference['revision']}: {before:,.0f} desc/s, {rate / before:.2f}x)" if before
+                     else f"   (not in {reference['revision']})")
+        elif baseline:
+            line += f"   (recorded in baseline.json: {baseline['descriptions_per_second'].get(mode, 0):,.0f} desc/s)"
+        print(line)
+    print("Golden snapshot agreement:")
+    for attribute, score in result["agreement"].items():
+        print(f"  {attribute:<24}{score:>8.1%}")
+
+
+def report_known_issues(golden):
+    known = [row for row in golden if row.get("known_issue")]
+    if known:
+        print(f"Known issues pinned in the snapshot: {len(known)}")
+        for row in known:
+            print(f"  {row['description']!r} ({row['product_code']}): {row['known_issue']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--size", type=int, default=20000, help="synthetic corpus size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", metavar="REV",
+                        help="git revision to measure in the same run; throughput may not drop below it")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed throughput drop relative to --compare (default: 0.15)")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    result, failures = run(args.size, args.repeat, args.seed, args.compare)
+    baseline = None
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    report(result, baseline)
+    report_known_issues(load_golden())
+
+    for description, expected, actual in failures:
+        print(f"GOLDEN MISMATCH {description!r}: expected {expected}, got {actual}")
+
+    if args.update_baseline:
+        result.pop("reference", None)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return
+
+    problems = compare(result, baseline, args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if problems or failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
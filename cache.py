@@ -0,0 +1,90 @@
+"""Bounded LRU cache in front of extract_attributes for repeated descriptions."""
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from core import extract_attributes
+
+DEFAULT_MAXSIZE = 100_000
+
+
+def cache_key(supplier_text):
+    """Normalized cache key for a description.
+
+    Only surrounding whitespace is dropped: every rule treats the start and
+    end of the text like whitespace, while case and inner spacing can change
+    the result (e.g. the case-sensitive "Primary ... V" voltage rule).
+    """
+    return supplier_text.strip()
+
+
+class ResultCache:
+    """Thread-safe LRU cache of ``(attributes, product_code)`` results.
+
+    Cached attributes are returned as read-only mappings of tuples, so a
+    caller cannot corrupt what other callers get back. Results are coded
+    with ``rule_set`` (core.DEFAULT_RULES if None); use a new cache for
+    another rule set.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, rule_set=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.rule_set = rule_set
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def extract(self, supplier_text):
+        """Cached equivalent of ``extract_attributes(supplier_text)``."""
+        key = cache_key(supplier_text)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+
+        attributes, product_code = extract_attributes(key, self.rule_set)
+        result = (MappingProxyType(attributes), product_code)
+
+        with self._lock:
+            self.misses += 1
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._results),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._results)
+
+
+default_cache = ResultCache()
+
+
+def extract_attributes_cached(supplier_text, cache=None):
+    """``extract_attributes`` through a shared LRU cache (the module default if None)."""
+    if cache is None:
+        cache = default_cache
+    return cache.extract(supplier_text)
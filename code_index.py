@@ -0,0 +1,217 @@
+"""On-disk column index of product codes for attribute queries.
+
+Usage:
+
+    python -m code_index build index/ coded.csv --column "Product code"
+    python -m code_index query index/ "Oil/Dry=Ester Oil" "Primary Voltage in kV=> 110 - 220 kV|> 220 kV"
+
+An index is a directory with one file per attribute holding a byte per row
+(the value index of schema/compact), plus meta.json with the row count and
+the attribute values the bytes refer to. Queries memory-map only the columns
+they filter on, so tens of millions of codes are answered without decoding
+codes or touching the descriptions again.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+from schema import SCHEMA, CodeSchema
+
+META_FILE = "meta.json"
+QUERY_CHUNK_ROWS = 1 << 24
+
+
+def _column_file(path, position):
+    return os.path.join(path, f"{position:02d}.col")
+
+
+class CodeIndexWriter:
+    """Write a new index at ``path``, row by row.
+
+    Rows are buffered and appended to the column files every
+    ``buffer_rows`` rows; the index is complete once close() has run.
+    """
+
+    def __init__(self, path, schema=SCHEMA, buffer_rows=1 << 16):
+        self.path = path
+        self.schema = schema
+        self.buffer_rows = buffer_rows
+        self.rows = 0
+        self._buffer = bytearray()
+        self._width = len(schema.segments)
+        os.makedirs(path, exist_ok=True)
+        for position in range(self._width):
+            open(_column_file(path, position), "wb").close()
+
+    def add(self, product_code):
+        """Add the row of a product code; ValueError if it is not valid."""
+        self._append(self.schema.decode_indexes(product_code))
+
+    def add_result(self, attributes, product_code=None):
+        """Add the row of an extract_attributes result."""
+        self._append(self.schema.decode_indexes(self.schema.encode(attributes)))
+
+    def _append(self, indexes):
+        self._buffer += indexes
+        self.rows += 1
+        if len(self._buffer) >= self.buffer_rows * self._width:
+            self.flush()
+
+    def flush(self):
+        rows = np.frombuffer(bytes(self._buffer), dtype=np.uint8).reshape(-1, self._width)
+        for position in range(self._width):
+            with open(_column_file(self.path, position), "ab") as f:
+                f.write(rows[:, position].tobytes())
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        meta = {
+            "prefix": self.schema.prefix,
+            "rows": self.rows,
+            "attributes": {attribute: [list(value) for value in segment.values]
+                           for attribute, segment in self.schema.segments.items()},
+        }
+        with open(os.path.join(self.path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.close()
+
+
+def build_index(path, product_codes, schema=SCHEMA):
+    """Write an index of ``product_codes`` at ``path``; returns the row count."""
+    with CodeIndexWriter(path, schema) as writer:
+        for product_code in product_codes:
+            writer.add(product_code)
+    return writer.rows
+
+
+class CodeIndex:
+    """Read-only view of an index written by CodeIndexWriter.
+
+    A query maps attributes to what is wanted: a label, a collection of
+    labels, or a callable ``(label, code) -> bool``. Rows whose segment code
+    is selected for every attribute match.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        # The schema the index was written with, even if the rules changed since
+        self.schema = CodeSchema({attribute: [tuple(value) for value in values]
+                                  for attribute, values in meta["attributes"].items()}, meta["prefix"])
+        self._positions = {attribute: position for position, attribute in enumerate(self.schema.segments)}
+        self._columns = {}
+
+    def column(self, attribute):
+        """Value indexes of one attribute for every row, memory-mapped."""
+        column = self._columns.get(attribute)
+        if column is None:
+            if self.rows == 0:
+                column = np.empty(0, dtype=np.uint8)
+            else:
+                column = np.memmap(_column_file(self.path, self._positions[attribute]), dtype=np.uint8,
+                                   mode="r", shape=(self.rows,))
+            self._columns[attribute] = column
+        return column
+
+    def _lookups(self, query):
+        lookups = []
+        for attribute, wanted in query.items():
+            if attribute not in self._positions:
+                raise KeyError(f"unknown attribute: {attribute}")
+            lookup = np.zeros(256, dtype=bool)
+            lookup[list(self.schema.segments[attribute].indexes_matching(wanted))] = True
+            lookups.append((self.column(attribute), lookup))
+        return lookups
+
+    def _masks(self, query):
+        lookups = self._lookups(query)
+        for start in range(0, self.rows, QUERY_CHUNK_ROWS):
+            stop = min(start + QUERY_CHUNK_ROWS, self.rows)
+            mask = np.ones(stop - start, dtype=bool)
+            for column, lookup in lookups:
+                mask &= lookup[column[start:stop]]
+            yield start, mask
+
+    def query(self, query):
+        """Row numbers matching ``query``, ascending, as an int64 array."""
+        parts = [start + np.flatnonzero(mask) for start, mask in self._masks(query)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def count(self, query):
+        return sum(int(np.count_nonzero(mask)) for _, mask in self._masks(query))
+
+    def product_code(self, row):
+        return self.schema.prefix + "".join(
+            segment.values[self.column(attribute)[row]][1] for attribute, segment in self.schema.segments.items())
+
+    def __len__(self):
+        return self.rows
+
+
+def read_codes(path, column=None):
+    """Product codes from a CSV column (default "Product code") or a text file, one per line."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield row[column or "Product code"]
+        else:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+
+def parse_condition(condition):
+    """``"Attribute=label|label"`` -> ``("Attribute", ["label", "label"])``."""
+    attribute, separator, labels = condition.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected ATTRIBUTE=LABEL[|LABEL...], got {condition!r}")
+    return attribute.strip(), [label.strip() for label in labels.split("|")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query an on-disk index of product codes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index the product codes of a CSV or text file")
+    build.add_argument("index", help="index directory to write")
+    build.add_argument("input", help="CSV with a product code column, or one code per line")
+    build.add_argument("-c", "--column", help='CSV column of the codes (default: "Product code")')
+    query = commands.add_parser("query", help="print the rows matching every condition")
+    query.add_argument("index", help="index directory")
+    query.add_argument("conditions", nargs="+", type=parse_condition, metavar="ATTRIBUTE=LABEL[|LABEL...]")
+    query.add_argument("--count", action="store_true", help="only print the number of matching rows")
+    query.add_argument("--limit", type=int, help="print at most N rows")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        rows = build_index(args.index, read_codes(args.input, args.column))
+        print(f"Indexed {rows} codes in {args.index}")
+        return
+
+    index = CodeIndex(args.index)
+    conditions = dict(args.conditions)
+    try:
+        rows = index.query(conditions)
+    except (KeyError, ValueError) as error:
+        parser.error(str(error))
+    if args.count:
+        print(len(rows))
+        return
+    for row in rows[:args.limit]:
+        sys.stdout.write(f"{row}\t{index.product_code(row)}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Compact storage of coding results for large result sets.
+
+A result of extract_attributes is a fresh dict of ten (label, code) tuples,
+several hundred bytes per description. Here each attribute value is stored
+as its index into core.ATTRIBUTE_VALUES instead, so the labels exist once:
+
+- CompactResult holds one result in ten bytes (plus object overhead);
+- CodedColumns holds many results as one signed-byte array per attribute
+  and converts to a DataFrame of pandas categoricals without copying.
+
+Both give the usual ``(attributes, product_code)`` shape back on request.
+"""
+from array import array
+from collections.abc import Mapping
+
+from core import ATTRIBUTE_VALUES, DEFAULT_ATTRIBUTES, PRODUCT_CODE_PREFIX
+
+ATTRIBUTES = tuple(DEFAULT_ATTRIBUTES)
+_POSITIONS = {attribute: position for position, attribute in enumerate(ATTRIBUTES)}
+# (label, code) -> index into ATTRIBUTE_VALUES, per attribute
+VALUE_INDEXES = {attribute: {value: index for index, value in enumerate(values)}
+                 for attribute, values in ATTRIBUTE_VALUES.items()}
+_VALUES = tuple(ATTRIBUTE_VALUES[attribute] for attribute in ATTRIBUTES)
+_INDEXES = tuple(VALUE_INDEXES[attribute] for attribute in ATTRIBUTES)
+
+
+def encode(attributes):
+    """Value indexes of an attributes dict, in product-code order, as bytes."""
+    try:
+        return bytes(index[tuple(attributes[attribute])] for attribute, index in zip(ATTRIBUTES, _INDEXES))
+    except KeyError as error:
+        raise ValueError(f"not a known attribute value: {error}") from None
+
+
+def product_code_of(indexes):
+    return PRODUCT_CODE_PREFIX + "".join(values[i][1] for values, i in zip(_VALUES, indexes))
+
+
+class AttributesView(Mapping):
+    """Read-only ``{attribute: (label, code)}`` mapping over value indexes."""
+
+    __slots__ = ("_indexes",)
+
+    def __init__(self, indexes):
+        self._indexes = indexes
+
+    def __getitem__(self, attribute):
+        position = _POSITIONS[attribute]
+        return _VALUES[position][self._indexes[position]]
+
+    def __iter__(self):
+        return iter(ATTRIBUTES)
+
+    def __len__(self):
+        return len(ATTRIBUTES)
+
+    def __repr__(self):
+        return f"AttributesView({dict(self)!r})"
+
+
+class CompactResult:
+    """One coding result stored as ten value indexes."""
+
+    __slots__ = ("indexes",)
+
+    def __init__(self, indexes):
+        self.indexes = bytes(indexes)
+
+    @classmethod
+    def from_result(cls, attributes, product_code=None):
+        return cls(encode(attributes))
+
+    @property
+    def attributes(self):
+        return AttributesView(self.indexes)
+
+    @property
+    def product_code(self):
+        return product_code_of(self.indexes)
+
+    def as_result(self):
+        """The ``(attributes, product_code)`` pair extract_attributes returns."""
+        return dict(self.attributes), self.product_code
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactResult):
+            return NotImplemented
+        return self.indexes == other.indexes
+
+    def __hash__(self):
+        return hash(self.indexes)
+
+    def __repr__(self):
+        return f"CompactResult({self.product_code!r})"
+
+
+class CodedColumns:
+    """Columnar results: one small-int array per attribute, row i = result i.
+
+    While a DataFrame from to_dataframe is alive it shares these arrays, and
+    Python refuses to grow them (BufferError); build the columns first.
+    """
+
+    def __init__(self):
+        self.columns = {attribute: array("b") for attribute in ATTRIBUTES}
+
+    @classmethod
+    def from_results(cls, results):
+        """Build from an iterable of ``(attributes, product_code)`` results."""
+        columns = cls()
+        columns.extend(results)
+        return columns
+
+    def append(self, attributes, product_code=None):
+        for attribute, index in zip(ATTRIBUTES, encode(attributes)):
+            self.columns[attribute].append(index)
+
+    def extend(self, results):
+        for attributes, _ in results:
+            self.append(attributes)
+
+    def __len__(self):
+        return len(self.columns[ATTRIBUTES[0]])
+
+    def __getitem__(self, row):
+        return CompactResult([self.columns[attribute][row] for attribute in ATTRIBUTES])
+
+    def __iter__(self):
+        for indexes in zip(*self.columns.values()):
+            yield CompactResult(indexes)
+
+    def product_codes(self):
+        for indexes in zip(*self.columns.values()):
+            yield product_code_of(indexes)
+
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+    def to_dataframe(self, product_code=False):
+        """DataFrame with one categorical label column per attribute.
+
+        The categorical codes are views of the arrays, except where a label
+        occurs under two codes ("Unknown" power, coded "X" or ""): those
+        codes are remapped into a new array. With ``product_code`` a plain
+        string column of product codes is added.
+        """
+        import numpy as np
+        import pandas as pd
+
+        frame = {}
+        for attribute, column in self.columns.items():
+            labels = [label for label, _ in ATTRIBUTE_VALUES[attribute]]
+            codes = np.frombuffer(column, dtype=np.int8)
+            categories = list(dict.fromkeys(labels))
+            if len(categories) < len(labels):
+                remap = np.array([categories.index(label) for label in labels], dtype=np.int8)
+                codes = remap[codes]
+            frame[attribute] = pd.Series(pd.Categorical.from_codes(codes, categories=categories), copy=False)
+        if product_code:
+            frame["Product code"] = pd.Series(list(self.product_codes()), dtype=object)
+        return pd.DataFrame(frame, copy=False)
@@ -0,0 +1,387 @@
+"""Extraction core: detectors and extract_attributes over the rules of rules.json.
+
+Only the standard library is imported here, so batch workers and the
+command-line tools start quickly; the Streamlit UI lives in backend.py.
+"""
+import bisect
+import logging
+import re
+import time
+
+import profiling
+from rules import RULES_FILE, NoLaterKVPattern, convert_v_to_kv, load_rules  # noqa: F401
+from scanner import WORD_PATTERN
+
+logger = logging.getLogger(__name__)
+# Inputs that hit the length cap or time budget of extract_attributes_guarded
+offender_logger = logging.getLogger(__name__ + ".offenders")
+
+
+# Attributes in product-code order, with the value used when nothing is detected
+DEFAULT_ATTRIBUTES = {
+    "Product type": ("Unknown", "X"),
+    "Power in MVA": ("Unknown", "X"),
+    "Primary Voltage in kV":("Unknown", "X"),
+    "Tap Changer": ("De-Energized Tap Changer", "0"),
+    "Application": ("Land Based", "0"),
+    "System Category": ("Product","A"),
+    "Oil/Dry": ("Unknown", "X"),
+    "Classification": ("Outdoor","1"),
+    "Standard": ("IEC", "0"),
+    "Winding material": ("Unknown", "X")
+}
+
+PRODUCT_CODE_PREFIX = "4JZZ"
+
+# Version of the detector logic, apart from the rule file: bump it when a change
+# to core.py, rules.py or scanner.py codes the same rules differently, so results
+# stored under the old version (see store.py) are coded again.
+CODER_VERSION = 1
+
+# Limits of extract_attributes_guarded
+DEFAULT_MAX_LENGTH = 4096
+DEFAULT_TIME_BUDGET = 0.05  # seconds per description
+
+# Rule tables shared by all detectors, from the default rule file (see
+# rules.py). They are compiled once at import so a call only pays for the
+# matching itself; the detectors also take another RuleSet.
+DEFAULT_RULES = load_rules(RULES_FILE)
+
+# The default tables under the names the other modules use
+OIL_TYPE_SCANNER = DEFAULT_RULES.scanners["Oil/Dry"]
+APPLICATION_TYPE_SCANNER = DEFAULT_RULES.scanners["Application"]
+TAP_CHANGER_SCANNER = DEFAULT_RULES.scanners["Tap Changer"]
+PRODUCT_TYPE_SCANNER = DEFAULT_RULES.scanners["Product type"]
+SYSTEM_CATEGORY_SCANNER = DEFAULT_RULES.scanners["System Category"]
+CLASSIFICATION_SCANNER = DEFAULT_RULES.scanners["Classification"]
+STANDARD_SCANNER = DEFAULT_RULES.scanners["Standard"]
+WINDING_MATERIAL_SCANNER = DEFAULT_RULES.scanners["Winding material"]
+VOLTAGE_PATTERNS = DEFAULT_RULES.voltage_rules
+VOLTAGE_RANGES = DEFAULT_RULES.voltage_ranges
+VOLTAGE_RANGE_ENDS = DEFAULT_RULES.voltage_range_ends
+POWER_PATTERN = DEFAULT_RULES.power_pattern
+POWER_UNIT_DIVISORS = DEFAULT_RULES.power_unit_divisors
+POWER_RANGES = DEFAULT_RULES.power_ranges
+POWER_RANGE_STARTS = DEFAULT_RULES.power_range_starts
+
+NON_ALNUM_RUN_PATTERN = re.compile(r'[^A-Za-z0-9]+')
+DIGIT_PATTERN = re.compile(r'\d')
+LONG_WHITESPACE_PATTERN = re.compile(r'\s{3,}')
+
+
+class Document:
+    """A description plus the normalized forms the detectors share.
+
+    Each form is computed on first use and then reused, so a description is
+    lowercased, split into words and so on once, however many detectors ask.
+    The detectors accept a Document wherever they take supplier text.
+    """
+
+    __slots__ = ("text", "_lower", "_words", "_oil_text", "_oil_lower", "_oil_words")
+
+    def __init__(self, text):
+        self.text = text
+        self._lower = self._words = self._oil_text = self._oil_lower = self._oil_words = None
+
+    @property
+    def lower(self):
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def words(self):
+        """The lowercase words (WORD_PATTERN) of the text, as a set."""
+        if self._words is None:
+            self._words = set(WORD_PATTERN.findall(self.lower))
+        return self._words
+
+    @property
+    def oil_text(self):
+        """Uppercase text with every run of other characters than A-Z, 0-9 as one space."""
+        if self._oil_text is None:
+            self._oil_text = NON_ALNUM_RUN_PATTERN.sub(' ', self.text.upper()).strip()
+        return self._oil_text
+
+    @property
+    def oil_lower(self):
+        if self._oil_lower is None:
+            self._oil_lower = self.oil_text.lower()
+        return self._oil_lower
+
+    @property
+    def oil_words(self):
+        # oil_text only has letters, digits and single spaces
+        if self._oil_words is None:
+            self._oil_words = set(self.oil_lower.split())
+        return self._oil_words
+
+
+def as_document(supplier_text):
+    return supplier_text if isinstance(supplier_text, Document) else Document(supplier_text)
+
+
+def detect_oil_type(supplier_text, rule_set=None):
+    rule_set = rule_set or DEFAULT_RULES
+    document = as_document(supplier_text)
+    attributes = {}  # Ensure attributes dictionary exists
+
+    attributes["Oil/Dry"] = rule_set.scanners["Oil/Dry"].search(  # Default to Mineral Oil
+        document.oil_text, rule_set.fallbacks["Oil/Dry"], document.oil_lower, lambda: document.oil_words)
+    return attributes
+
+
+
+def detect_application_type(text, rule_set=None):
+    """Detects application type from text. Defaults to 'Land Based' if not specified."""
+    rule_set = rule_set or DEFAULT_RULES
+    document = as_document(text)
+    attributes = {}
+
+    # Stops at the first match, defaults to Land based if no match is found
+    attributes["Application"] = rule_set.scanners["Application"].search(
+        document.lower, rule_set.fallbacks["Application"], document.lower, lambda: document.words)
+    return attributes
+
+
+def detect_tap_changer(text, rule_set=None):
+    """Detect tap changer type: OLTC (On-Load Tap Changer) or DTC (De-Energized Tap Changer), updating an attributes dictionary."""
+    rule_set = rule_set or DEFAULT_RULES
+    document = as_document(text)
+    attributes = {}
+
+    if not document.text or document.text.strip() == "":
+        attributes["Tap Changer"] = rule_set.fallbacks["Tap Changer"]  # Default to DTC if nothing is specified
+        return attributes
+
+    # Check for OLTC match, then DTC match, then the default case
+    attributes["Tap Changer"] = rule_set.scanners["Tap Changer"].search(
+        document.lower, rule_set.fallbacks["Tap Changer"], document.lower, lambda: document.words)
+    return attributes
+
+
+
+
+class TimeBudgetExceeded(Exception):
+    """Raised when a guarded extraction runs past its deadline."""
+
+
+def _shorten_whitespace(match):
+    # Two characters still fail a literal single space, and a kept newline
+    # still stops the "." of a lookahead.
+    return " \n" if "\n" in match.group() else "  "
+
+
+def shorten_whitespace_runs(text):
+    """Cut whitespace runs to two characters, which no voltage rule can tell apart.
+
+    Whitespace is only ever matched as \\s*, \\s+ or a single space, so this
+    keeps every result while bounding backtracking over long runs.
+    """
+    return LONG_WHITESPACE_PATTERN.sub(_shorten_whitespace, text)
+
+
+def primary_voltage_kv(text, deadline=None, rule_set=None):
+    """Return the primary voltage in kV from the first matching pattern, or None.
+
+    With a ``deadline`` (a ``time.perf_counter()`` value), raises
+    TimeBudgetExceeded instead of trying another rule once it has passed.
+    """
+    # Every rule needs a digit and a V/v unit
+    if ("v" not in text and "V" not in text) or not DIGIT_PATTERN.search(text):
+        return None
+
+    text = shorten_whitespace_runs(text)
+    text_lower = text.lower() if text.isascii() else None
+
+    profiler = profiling.active
+    for index, (pattern, func, hints) in enumerate((rule_set or DEFAULT_RULES).voltage_rules, 1):
+        if hints and text_lower is not None and not any(hint in text_lower for hint in hints):
+            continue
+        if deadline is not None and time.perf_counter() > deadline:
+            raise TimeBudgetExceeded(pattern.pattern)
+        if profiler is None:
+            match = pattern.search(text)
+        else:
+            start = time.perf_counter()
+            match = pattern.search(text)
+            profiler.record("patterns", f"voltage#{index}", time.perf_counter() - start, pattern.pattern)
+        if match:
+            return func(match)
+    return None
+
+
+def classify_voltage_range(primary_voltage, rule_set=None):
+    """Classify a primary voltage in kV into predefined ranges."""
+    rule_set = rule_set or DEFAULT_RULES
+    # Values below the first range and NaN fall into the first and last class, as before
+    index = bisect.bisect_right(rule_set.voltage_range_ends, primary_voltage)
+    _, _, description, code = rule_set.voltage_ranges[index]
+    return description, code
+
+
+def extract_primary_voltage(text, deadline=None, rule_set=None):
+    primary_voltage = primary_voltage_kv(text, deadline, rule_set)
+    if primary_voltage is None:
+        return "Unknown", ""
+
+    logger.debug("Extracted primary voltage: %s kV", primary_voltage)
+    return classify_voltage_range(primary_voltage, rule_set)
+
+
+def classify_power_range(mva_value, rule_set=None):
+    """Classify power into predefined ranges."""
+    rule_set = rule_set or DEFAULT_RULES
+    index = bisect.bisect_right(rule_set.power_range_starts, mva_value) - 1
+    if index >= 0 and mva_value < rule_set.power_ranges[index][1]:
+        _, _, description, code = rule_set.power_ranges[index]
+        return description, code
+    return "Unknown", ""
+
+
+
+def detect_product_type(supplier_text, rule_set=None):
+    # Synonyms are substrings without surrounding spaces, so the text needs no strip()
+    document = as_document(supplier_text)
+    return (rule_set or DEFAULT_RULES).scanners["Product type"].search(
+        document.lower, None, document.lower, lambda: document.words)
+
+
+def detect_power(supplier_text, rule_set=None):
+    rule_set = rule_set or DEFAULT_RULES
+    power_match = rule_set.power_pattern.search(as_document(supplier_text).text)
+    if power_match:
+        # Groups: value (unit first), or value and unit
+        power_value = float(power_match.group(1) or power_match.group(2))
+        power_unit = (power_match.group(3) or rule_set.power_default_unit).lower()
+        return classify_power_range(power_value / rule_set.power_unit_divisors[power_unit], rule_set)
+    return None
+
+
+def detect_primary_voltage(supplier_text, rule_set=None, deadline=None):
+    voltage_value = extract_primary_voltage(as_document(supplier_text).text, deadline, rule_set)
+    if voltage_value[0] != "Unknown":
+        return voltage_value
+    return None
+
+
+def _scan(attribute):
+    """Detector searching the ``attribute`` rules case-insensitively over the original text."""
+    def detect(document, rule_set=None):
+        document = as_document(document)
+        return (rule_set or DEFAULT_RULES).scanners[attribute].search(
+            document.text, None, document.lower, lambda: document.words)
+    return detect
+
+
+detect_system_category = _scan("System Category")
+
+
+# One detector per attribute, in product-code order. Each takes the Document
+# of a description and the RuleSet to apply, and returns the (label, code) it
+# found, or None to keep the default.
+ATTRIBUTE_DETECTORS = {
+    "Product type": detect_product_type,
+    "Power in MVA": detect_power,
+    "Primary Voltage in kV": detect_primary_voltage,
+    "Tap Changer": lambda document, rule_set: detect_tap_changer(document, rule_set)["Tap Changer"],
+    "Application": lambda document, rule_set: detect_application_type(document, rule_set)["Application"],
+    "System Category": detect_system_category,
+    "Oil/Dry": lambda document, rule_set: detect_oil_type(document, rule_set)["Oil/Dry"],
+    "Classification": _scan("Classification"),
+    "Standard": _scan("Standard"),
+    "Winding material": _scan("Winding material"),
+}
+
+
+def attribute_values(rule_set):
+    """Every (label, code) each attribute can come out as under ``rule_set``.
+
+    Values are without duplicates: the default first, then the detector
+    values in rule order. ("Unknown", "X") is included throughout because
+    extract_attributes_guarded codes timed-out attributes that way.
+    """
+    values = {attribute: [value for _, value in scanner.rules] for attribute, scanner in rule_set.scanners.items()}
+    for attribute, fallback in rule_set.fallbacks.items():
+        values[attribute].append(fallback)
+    values["Power in MVA"] = [(description, code) for _, _, description, code in rule_set.power_ranges] + [("Unknown", "")]
+    values["Primary Voltage in kV"] = [(description, code) for _, _, description, code in rule_set.voltage_ranges]
+    return {attribute: tuple(dict.fromkeys([default, *values[attribute], ("Unknown", "X")]))
+            for attribute, default in DEFAULT_ATTRIBUTES.items()}
+
+
+ATTRIBUTE_VALUES = attribute_values(DEFAULT_RULES)
+
+
+def extract_attributes(supplier_text, rule_set=None):
+    """Extract key attributes from supplier text using regex and keyword matching.
+
+    ``rule_set`` is a rules.RuleSet to code with instead of DEFAULT_RULES.
+    """
+    rule_set = rule_set or DEFAULT_RULES
+    started = time.perf_counter()
+    attributes = dict(DEFAULT_ATTRIBUTES)
+    document = Document(supplier_text)
+
+    profiler = profiling.active
+    for attribute, detect in ATTRIBUTE_DETECTORS.items():
+        if profiler is None:
+            value = detect(document, rule_set)
+        else:
+            start = time.perf_counter()
+            value = detect(document, rule_set)
+            profiler.record("detectors", attribute, time.perf_counter() - start)
+        if value is not None:
+            attributes[attribute] = value
+
+    product_code = PRODUCT_CODE_PREFIX + "".join(val[1] for val in attributes.values())
+
+    rule_set.record(time.perf_counter() - started)
+    return attributes, product_code
+
+
+def extract_attributes_guarded(supplier_text, max_length=DEFAULT_MAX_LENGTH, time_budget=DEFAULT_TIME_BUDGET,
+                               rule_set=None):
+    """Hardened extract_attributes for untrusted bulk input.
+
+    Text longer than ``max_length`` characters is cut to that length, and
+    once ``time_budget`` seconds have been spent the remaining attributes
+    (including the one whose voltage rules ran over) are coded "X". Either
+    case is logged on ``offender_logger`` with the offending input.
+    """
+    if len(supplier_text) > max_length:
+        offender_logger.warning("Description of %d characters cut to %d: %.200r",
+                                len(supplier_text), max_length, supplier_text)
+        supplier_text = supplier_text[:max_length]
+
+    rule_set = rule_set or DEFAULT_RULES
+    started = time.perf_counter()
+    deadline = started + time_budget
+    attributes = dict(DEFAULT_ATTRIBUTES)
+    document = Document(supplier_text)
+    timed_out = []
+
+    for attribute, detect in ATTRIBUTE_DETECTORS.items():
+        if timed_out or time.perf_counter() > deadline:
+            timed_out.append(attribute)
+            attributes[attribute] = ("Unknown", "X")
+            continue
+        try:
+            if detect is detect_primary_voltage:
+                value = detect(document, rule_set, deadline)
+            else:
+                value = detect(document, rule_set)
+        except TimeBudgetExceeded:
+            timed_out.append(attribute)
+            attributes[attribute] = ("Unknown", "X")
+            continue
+        if value is not None:
+            attributes[attribute] = value
+
+    if timed_out:
+        offender_logger.warning("Time budget of %.0f ms exceeded, coded %s as X: %.200r",
+                                time_budget * 1000, ", ".join(timed_out), supplier_text)
+
+    product_code = PRODUCT_CODE_PREFIX + "".join(val[1] for val in attributes.values())
+    rule_set.record(time.perf_counter() - started)
+    return attributes, product_code
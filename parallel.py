@@ -0,0 +1,80 @@
+"""Process-pool execution of extract_attributes for large description corpora."""
+import functools
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import rules
+from core import extract_attributes, extract_attributes_guarded
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def code_chunk(texts, guarded=False, rules_file=None):
+    """Code a list of descriptions in the current process.
+
+    With ``guarded`` each description goes through extract_attributes_guarded,
+    so one pathological line cannot stall the worker. With ``rules_file``
+    the chunk is coded with the current rules of that file, which each
+    process reloads on its own when the file changes (see rules.RuleEngine).
+    """
+    rule_set = None if rules_file is None else rules.engine(rules_file).current()
+    if guarded:
+        return [extract_attributes_guarded(text, rule_set=rule_set) for text in texts]
+    return [extract_attributes(text, rule_set) for text in texts]
+
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most ``size`` items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_chunks(func, iterable, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, executor=None):
+    """Apply ``func`` to chunks of ``iterable`` in a process pool.
+
+    Yields one result per chunk, in input order, as soon as that chunk and all
+    chunks before it have finished. At most two chunks per worker are in
+    flight, so the input is consumed lazily and memory stays bounded. Pass an
+    existing ``executor`` to reuse a warm pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(iterable, chunk_size)
+    if executor is None and workers == 1:
+        yield from map(func, chunks)
+        return
+
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def iter_code_parallel(descriptions, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, executor=None, guarded=False,
+                       rules_file=None):
+    """Yield ``(attributes, product_code)`` for each description, in input order."""
+    func = functools.partial(code_chunk, guarded=guarded, rules_file=rules_file)
+    for results in imap_chunks(func, descriptions, workers, chunk_size, executor):
+        yield from results
+
+
+def code_parallel(descriptions, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, guarded=False):
+    """Code all descriptions using a process pool; returns a list in input order."""
+    return list(iter_code_parallel(descriptions, workers, chunk_size, guarded=guarded))
@@ -0,0 +1,238 @@
+"""Asyncio pipeline that codes many supplier export files at once.
+
+Usage:
+
+    python -m pipeline exports/*.csv exports/*.xlsx -o coded/ --workers 0
+
+Each source (CSV, XLSX, JSONL or plain text with one description per line)
+is read in batches on a thread, the batches are coded on a shared process
+pool, and the results are written in input order to ``<output>/<name>.jsonl``
+(or ``.csv``). Reading, coding and writing of all sources overlap; at most
+``max_open_files`` sources are open and ``max_pending_batches`` batches are
+being coded or waiting to be written at any time.
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import functools
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from parallel import DEFAULT_CHUNK_SIZE, chunked, code_chunk
+from streaming import WRITERS, read_lines
+
+DEFAULT_MAX_OPEN_FILES = 8
+
+
+class SourceError(ValueError):
+    """A source file that cannot be coded; the message names the file (and line)."""
+
+
+def iter_descriptions(path, column=None):
+    """Yield the descriptions of a CSV, XLSX, JSONL or text file, lazily where possible.
+
+    ``column`` names the CSV/XLSX column (default: the first) or the JSONL
+    field (default: "description"; lines may also be plain JSON strings).
+    Raises SourceError for a missing column or a malformed JSONL line.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xlsx":
+        from batch import read_descriptions  # pandas, only for Excel sources
+        try:
+            descriptions = read_descriptions(path, column)
+        except ValueError as error:
+            raise SourceError(f"{path}: {error}") from None
+        yield from descriptions.fillna("").astype(str)
+    elif extension == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            if column and column not in header:
+                raise SourceError(f"{path}: no column {column!r} (columns: {', '.join(header)})")
+            index = header.index(column) if column else 0
+            for row in reader:
+                yield row[index] if index < len(row) else ""
+    elif extension == ".jsonl":
+        key = column or "description"
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    raise SourceError(f"{path}:{number}: invalid JSON: {error}") from None
+                if isinstance(record, str):
+                    yield record
+                elif isinstance(record, dict):
+                    yield str(record.get(key) or "")
+                else:
+                    raise SourceError(f"{path}:{number}: expected a JSON object or string, "
+                                      f"got {type(record).__name__}")
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from read_lines(f)
+
+
+def output_path(source, output_dir, output_format):
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(output_dir, f"{name}.{output_format}")
+
+
+def output_targets(sources, output_dir, output_format):
+    """The output file of each source; ValueError if a source is unsupported or would be overwritten."""
+    for source in sources:
+        if os.path.splitext(source)[1].lower() == ".xls":
+            raise ValueError(f"{source}: legacy .xls files are not supported, save the sheet as .xlsx or .csv")
+    targets = [output_path(source, output_dir, output_format) for source in sources]
+    if len(set(targets)) < len(targets):
+        raise ValueError("sources with the same file name would overwrite each other's output")
+    for target in targets:
+        for source in sources:
+            if _same_file(target, source):
+                raise ValueError(f"output {target} would overwrite source {source}; choose another output directory")
+    return targets
+
+
+def _same_file(target, source):
+    if os.path.realpath(target) == os.path.realpath(source):
+        return True
+    return os.path.exists(target) and os.path.exists(source) and os.path.samefile(target, source)
+
+
+def _write_batch(writer, batch, results):
+    for description, (attributes, product_code) in zip(batch, results):
+        writer.write(description, attributes, product_code)
+    writer.flush()
+
+
+async def code_source(source, target, executor, pending, batch_size=DEFAULT_CHUNK_SIZE, column=None,
+                      output_format="jsonl", guarded=False):
+    """Code one file into ``target``; returns the number of descriptions.
+
+    ``pending`` is an asyncio.Semaphore shared by all sources that bounds the
+    batches in flight, so a slow writer or pool holds back the readers.
+    """
+    loop = asyncio.get_running_loop()
+    func = functools.partial(code_chunk, guarded=True) if guarded else code_chunk
+    batches = chunked(iter_descriptions(source, column), batch_size)
+    in_flight = deque()
+    count = 0
+
+    async def write_oldest():
+        batch, future = in_flight.popleft()
+        try:
+            results = await future
+        finally:
+            pending.release()
+        await asyncio.to_thread(_write_batch, writer, batch, results)
+        return len(batch)
+
+    f = await asyncio.to_thread(open, target, "w", encoding="utf-8", newline="")
+    try:
+        writer = await asyncio.to_thread(WRITERS[output_format], f, 0)
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            # Free a slot by writing our own oldest batch rather than waiting
+            # for one we may be holding ourselves.
+            while pending.locked() and in_flight:
+                count += await write_oldest()
+            await pending.acquire()
+            in_flight.append((batch, loop.run_in_executor(executor, func, batch)))
+            while in_flight and in_flight[0][1].done():
+                count += await write_oldest()
+        while in_flight:
+            count += await write_oldest()
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+            pending.release()
+        await asyncio.to_thread(f.close)
+    return count
+
+
+async def code_files(sources, output_dir, workers=None, batch_size=DEFAULT_CHUNK_SIZE, column=None,
+                     output_format="jsonl", guarded=False, max_open_files=DEFAULT_MAX_OPEN_FILES,
+                     max_pending_batches=None, executor=None):
+    """Code every source file concurrently; returns ``{source: descriptions coded}``.
+
+    ``workers`` sizes the process pool (``None`` uses every core) unless an
+    ``executor`` is passed. ``max_pending_batches`` defaults to two per worker.
+    A source that fails leaves no output file; the other sources are still
+    coded, and then the error of the first failed source is raised.
+    """
+    targets = output_targets(sources, output_dir, output_format)
+    workers = workers or os.cpu_count() or 1
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    open_files = asyncio.Semaphore(max_open_files)
+    pending = asyncio.Semaphore(max_pending_batches or 2 * workers)
+    os.makedirs(output_dir, exist_ok=True)
+
+    async def run(source, target):
+        async with open_files:
+            try:
+                return await code_source(source, target, executor, pending, batch_size, column, output_format,
+                                         guarded)
+            except BaseException:
+                # Don't leave a partial output that looks like a coded file
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(target)
+                raise
+
+    try:
+        counts = await asyncio.gather(*(run(source, target) for source, target in zip(sources, targets)),
+                                      return_exceptions=True)
+    finally:
+        if owns_executor:
+            executor.shutdown(cancel_futures=True)
+    for count in counts:
+        if isinstance(count, BaseException):
+            raise count
+    return dict(zip(sources, counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code many supplier export files concurrently.")
+    parser.add_argument("sources", nargs="+", help="CSV, XLSX, JSONL or text files")
+    parser.add_argument("-o", "--output-dir", required=True, help="directory for the coded files")
+    parser.add_argument("-f", "--format", choices=WRITERS, default="jsonl", help="output format (default: jsonl)")
+    parser.add_argument("-c", "--column", help="description column or JSONL field")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="worker processes; 0 uses every core (default: 0)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="descriptions per worker task (default: %(default)s)")
+    parser.add_argument("--max-open-files", type=int, default=DEFAULT_MAX_OPEN_FILES,
+                        help="sources read at the same time (default: %(default)s)")
+    parser.add_argument("--max-pending-batches", type=int,
+                        help="batches coded or awaiting write at once (default: 2 per worker)")
+    parser.add_argument("--guarded", action="store_true",
+                        help="cap length and time per description (extract_attributes_guarded)")
+    args = parser.parse_args()
+
+    try:
+        output_targets(args.sources, args.output_dir, args.format)
+    except ValueError as error:
+        parser.error(str(error))
+
+    try:
+        counts = asyncio.run(code_files(
+            args.sources, args.output_dir, args.workers or None, args.batch_size, args.column, args.format,
+            args.guarded, args.max_open_files, args.max_pending_batches,
+        ))
+    except SourceError as error:
+        parser.exit(1, f"{parser.prog}: {error}\n")
+    for source, count in counts.items():
+        print(f"{count:>10}  {source} -> {output_path(source, args.output_dir, args.format)}")
+
+
+if __name__ == "__main__":
+    main()
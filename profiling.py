@@ -0,0 +1,116 @@
+"""Opt-in timing of detectors and individual rule patterns.
+
+    import profiling
+    profiler = profiling.enable()
+    ... code descriptions ...
+    print(profiler.to_json())
+    profiling.disable()
+
+While disabled (the default) the instrumented code only checks that
+``profiling.active`` is None.
+"""
+import json
+import threading
+from collections import deque
+
+DEFAULT_MAX_SAMPLES = 10_000
+
+# The running Profiler, or None when profiling is disabled
+active = None
+
+
+class _Stat:
+    __slots__ = ("count", "total", "samples", "source")
+
+    def __init__(self, max_samples, source):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=max_samples)
+        self.source = source
+
+    def quantile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self):
+        stat = {
+            "calls": self.count,
+            "total_seconds": self.total,
+            "p50_seconds": self.quantile(0.5),
+            "p99_seconds": self.quantile(0.99),
+        }
+        if self.source is not None:
+            stat["pattern"] = self.source
+        return stat
+
+
+class Profiler:
+    """Call counts, cumulative time and p50/p99 latency per detector and pattern.
+
+    Percentiles are computed over the most recent ``max_samples`` calls of
+    each detector or pattern.
+    """
+
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._stats = {"detectors": {}, "patterns": {}}
+        self._lock = threading.Lock()
+
+    def record(self, kind, name, seconds, source=None):
+        """Add one timed call; ``kind`` is "detectors" or "patterns"."""
+        with self._lock:
+            stat = self._stats[kind].get(name)
+            if stat is None:
+                stat = self._stats[kind][name] = _Stat(self.max_samples, source)
+            stat.count += 1
+            stat.total += seconds
+            stat.samples.append(seconds)
+
+    def reset(self):
+        with self._lock:
+            for stats in self._stats.values():
+                stats.clear()
+
+    def to_dict(self):
+        with self._lock:
+            return {kind: {name: stat.as_dict() for name, stat in stats.items()}
+                    for kind, stats in self._stats.items()}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix="transformer_coder"):
+        """Export in the Prometheus text format, one summary per kind."""
+        lines = []
+        for kind, stats in self.to_dict().items():
+            label = kind[:-1]
+            metric = f"{prefix}_{label}_latency_seconds"
+            lines.append(f"# HELP {metric} Latency of each {label} call.")
+            lines.append(f"# TYPE {metric} summary")
+            for name, stat in stats.items():
+                labels = f'{label}="{_escape_label(name)}"'
+                lines.append(f'{metric}{{{labels},quantile="0.5"}} {stat["p50_seconds"]!r}')
+                lines.append(f'{metric}{{{labels},quantile="0.99"}} {stat["p99_seconds"]!r}')
+                lines.append(f"{metric}_sum{{{labels}}} {stat['total_seconds']!r}")
+                lines.append(f"{metric}_count{{{labels}}} {stat['calls']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def enable(max_samples=DEFAULT_MAX_SAMPLES):
+    """Start profiling with a fresh Profiler and return it."""
+    global active
+    active = Profiler(max_samples)
+    return active
+
+
+def disable():
+    """Stop profiling; returns the Profiler that was running, if any."""
+    global active
+    profiler, active = active, None
+    return profiler
@@ -0,0 +1,413 @@
+"""Rule files: the rule tables of the detectors, as data.
+
+    from rules import RuleEngine
+    engine = RuleEngine("rules.json")
+    core.extract_attributes(text, engine.current())
+
+A rule file is JSON (or YAML, when PyYAML is installed) with a ``version``
+and, per attribute, its rules in priority order. A rule gives the
+``value`` ([label, code]) it codes and what it matches: one ``pattern``, a
+list of ``patterns``, literal ``keywords``, or whole ``words``. Voltage
+rules instead name a converter from VOLTAGE_CONVERTERS, and power and
+voltage list their ``ranges`` ([lower, upper or null, label, code]).
+rules.json next to this module holds the rules core uses by default.
+
+load_rules compiles a file once into a RuleSet, rejecting files the
+detectors could not code with (missing fallbacks, malformed values, empty
+or unsorted ranges). RuleEngine keeps a file compiled and, when the file
+changes, compiles the new version, checks that it codes the
+SMOKE_DESCRIPTIONS and swaps it in as one reference, so long-running
+processes pick up rule edits without a restart, and a description is
+always coded by a single rule set.
+
+    python -m rules rules.json new_rules.yaml --sample descriptions.txt
+
+prints the compile time of each file and its match cost on the sample.
+"""
+import argparse
+import bisect
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from scanner import KeywordScanner
+
+logger = logging.getLogger(__name__)
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+DEFAULT_CHECK_INTERVAL = 1.0  # seconds between checks of the rule file
+
+# Attributes coded with a KeywordScanner, with the name the profiler uses for their rules
+SCANNED_ATTRIBUTES = {
+    "Product type": "product_type",
+    "Tap Changer": "tap_changer",
+    "Application": "application",
+    "System Category": "system_category",
+    "Oil/Dry": "oil_type",
+    "Classification": "classification",
+    "Standard": "standard",
+    "Winding material": "winding_material",
+}
+
+# Attributes whose detector codes the rule file's ``fallback`` when no rule matches
+FALLBACK_ATTRIBUTES = ("Tap Changer", "Application", "Oil/Dry")
+
+# Descriptions a rule set must code without error before RuleEngine swaps it in;
+# between them they reach every detector, power unit and voltage converter path
+SMOKE_DESCRIPTIONS = (
+    "",
+    "Power transformer 40 MVA 132/33 kV ONAN OLTC outdoor IEC Cu",
+    "Distribution transformer 630 kVA 11/0.4 kV Dyn11 KNAN indoor",
+    "Dry type transformer 500 kW 13800V/480V",
+    "Auxiliary transformer 2000000 VA HV 690 V",
+    "Rectifier transformer 1000000 W Primary 14400V",
+    "Trafo KVA: 630 6,6 kV ± 2x2,5% / 0,4 kV",
+    "XFMR 1.1 x 10^4 V / 4 x 10^2 V",
+)
+
+KV_PATTERN = re.compile('kV')
+NEWLINE_PATTERN = re.compile('\n')
+
+
+def convert_v_to_kv(value):
+    """Convert voltage from V to kV if necessary"""
+    value = float(value)
+    return round(value / 1000, 3) if value >= 100 else round(value, 3)
+
+
+class NoLaterKVPattern:
+    """``pattern(?!.*kV)`` that doesn't rescan the rest of the line per candidate.
+
+    The lookahead makes a plain regex search quadratic on text with many
+    voltage-like candidates before a "kV". Here a candidate is accepted when
+    no "kV" starts between its end and the end of its line, which is looked
+    up by bisecting the "kV" and newline positions.
+    """
+
+    def __init__(self, pattern, flags=0):
+        self.regex = re.compile(pattern, flags)
+        self.pattern = pattern + "(?!.*kV)"
+
+    def search(self, text):
+        kv_starts = newlines = None
+        for match in self.regex.finditer(text):
+            if kv_starts is None:
+                kv_starts = [m.start() for m in KV_PATTERN.finditer(text)]
+                newlines = [m.start() for m in NEWLINE_PATTERN.finditer(text)]
+            end = match.end()
+            next_kv = bisect.bisect_left(kv_starts, end)
+            if next_kv == len(kv_starts):
+                return match
+            next_newline = bisect.bisect_left(newlines, end)
+            if next_newline < len(newlines) and newlines[next_newline] < kv_starts[next_kv]:
+                return match
+        return None
+
+
+def _number(text):
+    return float(text.replace(',', '.'))
+
+
+def _kv(match):
+    return _number(match.group(1))
+
+
+def _v_to_kv(match):
+    return convert_v_to_kv(_number(match.group(1)))
+
+
+def _max_kv(match):
+    return max(_number(group) for group in match.groups() if group)
+
+
+def _max_v_to_kv(match):
+    return convert_v_to_kv(max(_number(group) for group in match.groups() if group))
+
+
+# The two rules below once tested 'kV' against the lowercased unit, which
+# never matches: both values have always been read as volts, and still are.
+
+def _max_of_v_to_kv(match):
+    # (value, unit, value, unit)
+    return max(convert_v_to_kv(_number(match.group(1))), convert_v_to_kv(_number(match.group(3))))
+
+
+def _max_of_exponent_v_to_kv(match):
+    # (mantissa, exponent, unit, mantissa, exponent, unit)
+    return max(convert_v_to_kv(float(match.group(1)) * (10 ** int(match.group(2)))),
+               convert_v_to_kv(float(match.group(4)) * (10 ** int(match.group(5)))))
+
+
+def _exponent(match):
+    # (mantissa, exponent, unit)
+    return _number(match.group(1)) * (10 ** int(match.group(2))) / (1000 if match.group(3).lower() == 'v' else 1)
+
+
+# Converters a voltage rule can name: match -> primary voltage in kV
+VOLTAGE_CONVERTERS = {
+    "kv": _kv,
+    "v_to_kv": _v_to_kv,
+    "max_kv": _max_kv,
+    "max_v_to_kv": _max_v_to_kv,
+    "max_of_v_to_kv": _max_of_v_to_kv,
+    "max_of_exponent_v_to_kv": _max_of_exponent_v_to_kv,
+    "exponent": _exponent,
+}
+
+
+def _sources(rule):
+    """Regex sources of one scanner rule, in order."""
+    if "pattern" in rule:
+        return [rule["pattern"]]
+    if "patterns" in rule:
+        return list(rule["patterns"])
+    if "keywords" in rule:
+        return [re.escape(keyword) for keyword in rule["keywords"]]
+    if "words" in rule:
+        return [rf"\b{re.escape(word)}\b" for word in rule["words"]]
+    raise ValueError("rule needs one of pattern, patterns, keywords or words")
+
+
+def _value(value, where):
+    """A [label, code] value as a tuple; ValueError unless it is two strings."""
+    if not isinstance(value, (list, tuple)) or len(value) != 2 or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{where}: value must be [label, code] strings, got {value!r}")
+    return tuple(value)
+
+
+def _ranges(ranges, where):
+    """[lower, upper or null, label, code] ranges; ValueError unless non-empty, sorted and disjoint."""
+    if not ranges:
+        raise ValueError(f"{where}: ranges must not be empty")
+    compiled = []
+    for lower, upper, label, code in ranges:
+        upper = float('inf') if upper is None else upper
+        if not lower < upper or compiled and lower < compiled[-1][1]:
+            raise ValueError(f"{where}: ranges must be sorted, not overlap and have lower < upper")
+        compiled.append((lower, upper, *_value([label, code], where)))
+    return compiled
+
+
+class RuleSet:
+    """The rules of one rule file, compiled for the detectors in core.
+
+    ``scanners`` maps the SCANNED_ATTRIBUTES to KeywordScanners and
+    ``fallbacks`` to the value their detector codes when no rule matches;
+    the power and voltage attributes have their own compiled fields.
+    Match cost is what core.extract_attributes records with this rule set.
+    """
+
+    def __init__(self, data, source=None):
+        start = time.perf_counter()
+        self.source = source
+        self.version = data["version"]
+        self.digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+        attributes = data["attributes"]
+
+        self.scanners = {}
+        self.fallbacks = {}
+        for attribute, name in SCANNED_ATTRIBUTES.items():
+            spec = attributes[attribute]
+            rules = [(pattern, _value(rule["value"], attribute))
+                     for rule in spec["rules"] for pattern in _sources(rule)]
+            self.scanners[attribute] = KeywordScanner(rules, re.IGNORECASE if spec.get("ignore_case") else 0, name)
+            if "fallback" in spec:
+                self.fallbacks[attribute] = _value(spec["fallback"], f"{attribute} fallback")
+            elif attribute in FALLBACK_ATTRIBUTES:
+                raise ValueError(f"{attribute} needs a fallback value")
+
+        power = attributes["Power in MVA"]
+        self.power_pattern = re.compile(power["pattern"], re.IGNORECASE if power.get("ignore_case") else 0)
+        self.power_default_unit = power["default_unit"]
+        self.power_unit_divisors = {unit.lower(): divisor for unit, divisor in power["unit_divisors"].items()}
+        if self.power_default_unit.lower() not in self.power_unit_divisors:
+            raise ValueError(f"power default_unit {self.power_default_unit!r} has no unit_divisors entry")
+        if not all(divisor > 0 for divisor in self.power_unit_divisors.values()):
+            raise ValueError("power unit_divisors must be positive")
+        self.power_ranges = _ranges(power["ranges"], "Power in MVA")
+        self.power_range_starts = [lower for lower, _, _, _ in self.power_ranges]
+
+        voltage = attributes["Primary Voltage in kV"]
+        self.voltage_rules = []
+        for rule in voltage["rules"]:
+            if rule["converter"] not in VOLTAGE_CONVERTERS:
+                raise ValueError(f"unknown voltage converter {rule['converter']!r}")
+            flags = re.IGNORECASE if rule.get("ignore_case") else 0
+            pattern_type = NoLaterKVPattern if rule.get("unless_later_kv") else re.compile
+            self.voltage_rules.append((pattern_type(rule["pattern"], flags),
+                                       VOLTAGE_CONVERTERS[rule["converter"]], tuple(rule.get("hints", ()))))
+        # The last voltage range also takes values past its upper bound
+        self.voltage_ranges = _ranges(voltage["ranges"], "Primary Voltage in kV")
+        self.voltage_range_ends = [upper for _, upper, _, _ in self.voltage_ranges[:-1]]
+
+        self.rule_count = sum(len(scanner.rules) for scanner in self.scanners.values()) + len(self.voltage_rules) + 1
+        self.compile_seconds = time.perf_counter() - start
+        self.descriptions = 0
+        self.match_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Count one description coded in ``seconds``."""
+        with self._lock:
+            self.descriptions += 1
+            self.match_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            descriptions, match_seconds = self.descriptions, self.match_seconds
+        return {
+            "source": self.source,
+            "version": self.version,
+            "digest": self.digest,
+            "rules": self.rule_count,
+            "compile_seconds": self.compile_seconds,
+            "descriptions": descriptions,
+            "match_seconds": match_seconds,
+            "mean_match_seconds": match_seconds / descriptions if descriptions else 0.0,
+        }
+
+    def __repr__(self):
+        return f"RuleSet({self.source!r}, version={self.version!r}, digest={self.digest!r})"
+
+
+def read_rule_file(path):
+    """The data of a JSON or YAML rule file; ValueError if it does not parse."""
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            import yaml
+
+            try:
+                return yaml.safe_load(f)
+            except yaml.YAMLError as error:
+                raise ValueError(f"invalid rule file {path}: {error}") from None
+        try:
+            return json.load(f)
+        except ValueError as error:
+            raise ValueError(f"invalid rule file {path}: {error}") from None
+
+
+def check_rules(rule_set):
+    """Code SMOKE_DESCRIPTIONS with ``rule_set``; ValueError if a description fails."""
+    import core  # core imports this module
+
+    try:
+        for description in SMOKE_DESCRIPTIONS:
+            core.extract_attributes(description, rule_set)
+    except Exception as error:
+        raise ValueError(f"invalid rule file {rule_set.source}: coding {description!r} raised "
+                         f"{type(error).__name__}: {error}") from None
+    finally:
+        rule_set.descriptions, rule_set.match_seconds = 0, 0.0
+
+
+def load_rules(path=RULES_FILE):
+    """Read and compile a rule file; ValueError if it is not a valid one."""
+    data = read_rule_file(path)
+    try:
+        return RuleSet(data, path)
+    except (KeyError, TypeError, re.error) as error:
+        raise ValueError(f"invalid rule file {path}: {type(error).__name__}: {error}") from None
+    except ValueError as error:
+        raise ValueError(f"invalid rule file {path}: {error}") from None
+
+
+class RuleEngine:
+    """A rule file kept compiled and reloaded when it changes.
+
+    current() looks at the file's modification time at most every
+    ``check_interval`` seconds. A changed file is compiled completely and
+    checked with check_rules before it replaces the current RuleSet; if it
+    does not compile or fails the check, the error is logged and the
+    previous rules stay in use.
+    """
+
+    def __init__(self, path=RULES_FILE, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._mtime = os.stat(path).st_mtime_ns
+        self._rules = load_rules(path)
+        check_rules(self._rules)
+        self._checked = time.monotonic()
+
+    def current(self):
+        """The RuleSet to code the next description with."""
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            self.reload()
+        return self._rules
+
+    def reload(self, force=False):
+        """Compile the file again if it changed (or ``force``); True if the rules were swapped."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as error:
+            logger.error("Cannot read rule file %s, keeping %r: %s", self.path, self._rules, error)
+            return False
+        if mtime == self._mtime and not force:
+            return False
+        with self._lock:
+            if mtime == self._mtime and not force:
+                return False
+            self._mtime = mtime
+            try:
+                rules = load_rules(self.path)
+                check_rules(rules)
+            except (OSError, ValueError) as error:
+                self.last_error = str(error)
+                logger.error("Rule file %s not reloaded, keeping %r: %s", self.path, self._rules, error)
+                return False
+            self._rules = rules
+            self.reloads += 1
+            self.last_error = None
+        logger.info("Loaded %r in %.1f ms", rules, rules.compile_seconds * 1000)
+        return True
+
+    def stats(self):
+        return {**self._rules.stats(), "reloads": self.reloads, "last_error": self.last_error}
+
+
+@functools.lru_cache(maxsize=None)
+def engine(path=RULES_FILE):
+    """The RuleEngine of a rule file in this process, e.g. in a pool worker."""
+    return RuleEngine(path)
+
+
+def main():
+    import core
+
+    parser = argparse.ArgumentParser(description="Compile rule files and report their compile time and match cost.")
+    parser.add_argument("files", nargs="*", default=[RULES_FILE], help="JSON or YAML rule files (default: rules.json)")
+    parser.add_argument("--sample", help="text file, one description per line, to measure the match cost on")
+    args = parser.parse_args()
+
+    sample = []
+    if args.sample:
+        with open(args.sample, encoding="utf-8") as f:
+            sample = [line.rstrip("\n") for line in f if line.strip()]
+
+    print(f"{'rule file':<30}{'version':>9}{'rules':>7}{'compile ms':>12}{'match us/desc':>15}")
+    for path in args.files:
+        try:
+            rule_set = load_rules(path)
+            check_rules(rule_set)
+        except (OSError, ValueError) as error:
+            parser.exit(1, f"{error}\n")
+        for description in sample:
+            core.extract_attributes(description, rule_set)
+        stats = rule_set.stats()
+        match = f"{stats['mean_match_seconds'] * 1e6:.1f}" if sample else "-"
+        print(f"{os.path.basename(path):<30}{str(stats['version']):>9}{stats['rules']:>7}"
+              f"{stats['compile_seconds'] * 1000:>12.2f}{match:>15}")
+
+
+if __name__ == "__main__":
+    main()
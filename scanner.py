@@ -0,0 +1,173 @@
+"""Single-pass matcher shared by the keyword-table detectors.
+
+A rule table is an ordered list of ``(regex source, value)`` pairs where the
+first rule that matches anywhere in the text wins. Searching every rule costs
+rules x text length. ``KeywordScanner`` instead derives the literal prefix
+each rule has to start with, splits the text into words once, and only
+searches the few rules whose prefix actually occurs, still in table order, so
+the result is identical to trying every rule.
+"""
+import re
+import time
+
+import profiling
+
+WORD_PATTERN = re.compile(r'[a-z0-9_]+')
+ALNUM_RUN = re.compile(r'[A-Za-z0-9]*')
+
+
+def _split_alternatives(source):
+    """Split a regex source on its top-level '|'."""
+    parts, depth, start, i, in_class = [], 0, 0, 0, False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            parts.append(source[start:i])
+            start = i + 1
+        i += 1
+    parts.append(source[start:])
+    return parts
+
+
+def _group_end(source):
+    """Index just past the group that opens source, or -1."""
+    depth, i, in_class = 0, 0, False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return -1
+
+
+def _anchors(source, word=False):
+    """Literal prefixes that every match of source starts with, as (text, word) pairs, or None."""
+    anchors = []
+    for alternative in _split_alternatives(source):
+        starts_word = word
+        if alternative.startswith(r'\b'):
+            alternative, starts_word = alternative[2:], True
+        if alternative.startswith('('):
+            end = _group_end(alternative)
+            if end < 0 or alternative[end:end + 1] in ('?', '*', '{'):
+                return None
+            inner = alternative[1:end - 1]
+            if inner.startswith('?:'):
+                inner = inner[2:]
+            elif inner.startswith('?'):
+                return None
+            nested = _anchors(inner, starts_word)
+            if nested is None:
+                return None
+            anchors.extend(nested)
+            continue
+        literal = ALNUM_RUN.match(alternative).group()
+        if alternative[len(literal):len(literal) + 1] in ('?', '*', '{'):
+            literal = literal[:-1]
+        if not literal:
+            return None
+        anchors.append((literal.lower(), starts_word))
+    return anchors
+
+
+class KeywordScanner:
+    """Ordered rule table that returns the value of the first matching rule.
+
+    Prefixes of rules that start with ``\\b`` are looked up against the words
+    of the text; other prefixes are plain substring checks, and rules without
+    a literal prefix are always searched. Text that is not ASCII is checked
+    against every rule, since case-insensitive matching is then more than a
+    plain ``lower()``.
+    """
+
+    def __init__(self, rules, flags=0, name="rules"):
+        rules = list(rules)
+        self.name = name
+        self.rules = [(re.compile(source, flags), value) for source, value in rules]
+        self._always = []
+        self._substrings = []
+        self._prefixes = {}
+        for rank, (source, _) in enumerate(rules):
+            anchors = _anchors(source)
+            if anchors is None:
+                self._always.append(rank)
+                continue
+            for literal, word in anchors:
+                if word:
+                    self._prefixes.setdefault(literal, set()).add(rank)
+                else:
+                    self._substrings.append((literal, rank))
+        self._lengths = sorted({len(literal) for literal in self._prefixes})
+
+    def candidates(self, lower, words=None):
+        """Indexes of the rules that can match an ASCII text, in table order.
+
+        ``lower`` is the lowercased text; ``words`` its WORD_PATTERN words, or
+        a callable returning them, when the caller has them or can share them.
+        They are only needed, and a callable only called, when the table has
+        rules starting with ``\\b``.
+        """
+        ranks = set(self._always)
+        for literal, rank in self._substrings:
+            if literal in lower:
+                ranks.add(rank)
+        if self._prefixes:
+            prefixes, lengths = self._prefixes, self._lengths
+            if words is None:
+                words = set(WORD_PATTERN.findall(lower))
+            elif callable(words):
+                words = words()
+            for token in words:
+                for length in lengths:
+                    if length > len(token):
+                        break
+                    found = prefixes.get(token[:length])
+                    if found:
+                        ranks.update(found)
+        return sorted(ranks)
+
+    def search(self, text, default=None, lower=None, words=None):
+        """Value of the first rule that matches text, or ``default``.
+
+        ``lower`` and ``words`` may pass text.lower() and its words (or a
+        callable returning them, see candidates), e.g. from a core.Document.
+        """
+        if text.isascii():
+            ranks = self.candidates(text.lower() if lower is None else lower, words)
+        else:
+            ranks = range(len(self.rules))
+        rules = self.rules
+        profiler = profiling.active
+        for rank in ranks:
+            pattern, value = rules[rank]
+            if profiler is None:
+                matched = pattern.search(text)
+            else:
+                start = time.perf_counter()
+                matched = pattern.search(text)
+                profiler.record("patterns", f"{self.name}#{rank + 1}", time.perf_counter() - start, pattern.pattern)
+            if matched:
+                return value
+        return default
@@ -0,0 +1,103 @@
+"""Product code schema: the segments of a code and their meaning.
+
+    from schema import SCHEMA
+    SCHEMA.decode("4JZZ021000A0101")["Oil/Dry"]   # ("Mineral Oil", "0")
+
+The schema is derived from core.ATTRIBUTE_VALUES, so it follows the rule
+tables. A code is PRODUCT_CODE_PREFIX followed by one segment per attribute,
+in DEFAULT_ATTRIBUTES order. Segments are one character, except the product
+type ("02", ... or "X") and the power segment, which is empty when the value
+overflowed every range. A code therefore does not always have the same
+length, and the parse uses a regex built from the known segment codes.
+Where two labels share a code (Application "Land Based" and "Land based"),
+decoding returns the last one in ATTRIBUTE_VALUES order; for Application
+that is "Land based", the detector's fallback and by far the more common.
+"""
+import functools
+import re
+
+from core import ATTRIBUTE_VALUES, DEFAULT_ATTRIBUTES, PRODUCT_CODE_PREFIX
+
+
+class Segment:
+    """The codes one attribute can take in a product code."""
+
+    def __init__(self, attribute, values):
+        self.attribute = attribute
+        self.values = tuple(values)
+        # code -> last value with that code
+        self.by_code = {value[1]: value for value in self.values}
+        # code -> index into ATTRIBUTE_VALUES of the value decoded for it
+        self.index_by_code = {code: self.values.index(value) for code, value in self.by_code.items()}
+
+    def codes_matching(self, wanted):
+        """Segment codes selected by ``wanted``.
+
+        ``wanted`` is a label, a collection of labels, or a callable taking
+        ``(label, code)`` and returning a bool.
+        """
+        if callable(wanted):
+            return {code for label, code in self.values if wanted(label, code)}
+        labels = {wanted} if isinstance(wanted, str) else set(wanted)
+        unknown = labels - {label for label, _ in self.values}
+        if unknown:
+            raise ValueError(f"unknown {self.attribute} label(s): {', '.join(sorted(unknown))}")
+        return {code for label, code in self.values if label in labels}
+
+    def indexes_matching(self, wanted):
+        """Value indexes whose code is selected by ``wanted`` (see codes_matching)."""
+        codes = self.codes_matching(wanted)
+        return {index for index, (_, code) in enumerate(self.values) if code in codes}
+
+    def __repr__(self):
+        return f"Segment({self.attribute!r}, codes={list(self.by_code)!r})"
+
+
+class CodeSchema:
+    def __init__(self, attribute_values=None, prefix=PRODUCT_CODE_PREFIX):
+        attribute_values = ATTRIBUTE_VALUES if attribute_values is None else attribute_values
+        self.prefix = prefix
+        self.segments = {attribute: Segment(attribute, attribute_values[attribute])
+                         for attribute in DEFAULT_ATTRIBUTES}
+        # Longer codes first, so the empty power code is only used when needed
+        groups = "".join(
+            "(" + "|".join(re.escape(code) for code in sorted(segment.by_code, key=len, reverse=True)) + ")"
+            for segment in self.segments.values()
+        )
+        self.pattern = re.compile(re.escape(prefix) + groups)
+        self.decode_indexes = functools.lru_cache(maxsize=65536)(self._decode_indexes)
+
+    def _split(self, product_code):
+        match = self.pattern.fullmatch(product_code)
+        if match is None:
+            raise ValueError(f"not a valid product code: {product_code!r}")
+        return match.groups()
+
+    def decode(self, product_code):
+        """``{attribute: (label, code)}`` of a product code; ValueError if invalid."""
+        return {attribute: segment.by_code[code]
+                for (attribute, segment), code in zip(self.segments.items(), self._split(product_code))}
+
+    def _decode_indexes(self, product_code):
+        # Same value indexes as compact.encode, as bytes
+        return bytes(segment.index_by_code[code]
+                     for segment, code in zip(self.segments.values(), self._split(product_code)))
+
+    def encode(self, attributes):
+        """Product code of an attributes dict, as extract_attributes builds it."""
+        return self.prefix + "".join(attributes[attribute][1] for attribute in self.segments)
+
+    def is_valid(self, product_code):
+        return self.pattern.fullmatch(product_code) is not None
+
+    def matches(self, product_code, query):
+        """Whether a code satisfies ``{attribute: wanted}`` (see Segment.codes_matching)."""
+        codes = dict(zip(self.segments, self._split(product_code)))
+        return all(codes[attribute] in self.segments[attribute].codes_matching(wanted)
+                   for attribute, wanted in query.items())
+
+    def __repr__(self):
+        return f"CodeSchema({self.prefix!r}, {list(self.segments.values())!r})"
+
+
+SCHEMA = CodeSchema()
@@ -0,0 +1,303 @@
+"""Local HTTP/JSON coding service.
+
+Usage:
+
+    python -m server --port 8000 --workers 0
+
+Endpoints:
+
+    POST /code          {"description": "..."}       -> one record
+    POST /code/batch    {"descriptions": ["...", ...]} -> {"results": [record, ...]}
+    GET  /health        -> {"status": "ok", ...}
+    GET  /metrics       -> counters in the Prometheus text format
+
+Records have the golden corpus format (see streaming.to_record). Connections
+are kept alive (HTTP/1.1), single descriptions are coded in the request
+thread through an LRU cache, and large batches are fanned out to a process
+pool that is started once and reused, with results in input order.
+
+Rules come from a rule file (``--rules``, default rules.json) that the
+server and its workers reload when it changes; the cache starts empty for
+each new rule set.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import profiling
+import rules
+from cache import ResultCache
+from core import extract_attributes_guarded
+from parallel import DEFAULT_CHUNK_SIZE, iter_code_parallel
+from streaming import to_record
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+ENDPOINTS = ("/code", "/code/batch", "/health", "/metrics")
+
+
+class BadRequest(Exception):
+    pass
+
+
+def is_encodable(text):
+    """False for text with unpaired surrogates: valid as JSON escapes, but not as UTF-8."""
+    try:
+        text.encode()
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+class CodingService:
+    """Coding backend shared by every request thread of the server.
+
+    With ``workers`` other than 1 a process pool (``None`` uses every core)
+    codes batches larger than ``chunk_size``; smaller batches are coded in
+    the request thread. With ``guarded`` every description goes through
+    extract_attributes_guarded and the cache is bypassed. ``cache`` is
+    used until the rules of ``rules_file`` change, then replaced by an
+    empty cache of the same size.
+    """
+
+    def __init__(self, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, guarded=False, cache=None,
+                 rules_file=rules.RULES_FILE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.guarded = guarded
+        self.rules = rules.engine(rules_file)
+        self.cache = ResultCache(rule_set=self.rules.current()) if cache is None else cache
+        self.executor = None if self.workers == 1 else ProcessPoolExecutor(max_workers=self.workers)
+        self.started = time.time()
+        self.descriptions = 0
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def count_request(self, path, status):
+        with self._lock:
+            self._requests[path, status] = self._requests.get((path, status), 0) + 1
+
+    def count_descriptions(self, amount):
+        with self._lock:
+            self.descriptions += amount
+
+    def current(self):
+        """The rule set and result cache to code a request with."""
+        rule_set = self.rules.current()
+        with self._lock:
+            if self.cache.rule_set is not rule_set:
+                self.cache = ResultCache(self.cache.maxsize, rule_set)
+            return rule_set, self.cache
+
+    def code_one(self, description):
+        self.count_descriptions(1)
+        rule_set, cache = self.current()
+        if self.guarded:
+            return extract_attributes_guarded(description, rule_set=rule_set)
+        return cache.extract(description)
+
+    def code_batch(self, descriptions):
+        """Results for ``descriptions``, in input order."""
+        self.count_descriptions(len(descriptions))
+        if self.executor is None or len(descriptions) <= self.chunk_size:
+            rule_set, cache = self.current()
+            if self.guarded:
+                return [extract_attributes_guarded(description, rule_set=rule_set) for description in descriptions]
+            return [cache.extract(description) for description in descriptions]
+        return list(iter_code_parallel(descriptions, self.workers, self.chunk_size, self.executor, self.guarded,
+                                       self.rules.path))
+
+    def health(self):
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "uptime_seconds": time.time() - self.started,
+            "rules": self.rules.stats(),
+        }
+
+    def metrics(self, prefix="transformer_coder"):
+        """Request, description and cache counters in the Prometheus text format."""
+        with self._lock:
+            requests = dict(self._requests)
+            descriptions = self.descriptions
+        lines = [
+            f"# HELP {prefix}_requests_total HTTP requests by endpoint and status.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for (path, status), value in sorted(requests.items()):
+            lines.append(f'{prefix}_requests_total{{path="{path}",status="{status}"}} {value}')
+        lines += [
+            f"# HELP {prefix}_descriptions_total Descriptions coded.",
+            f"# TYPE {prefix}_descriptions_total counter",
+            f"{prefix}_descriptions_total {descriptions}",
+        ]
+        for name, value in self.cache.stats().items():
+            kind = "counter" if name in ("hits", "misses", "evictions") else "gauge"
+            metric = f"{prefix}_cache_{name}" + ("_total" if kind == "counter" else "")
+            lines += [f"# TYPE {metric} {kind}", f"{metric} {value}"]
+        # Match counters cover this process and the current rule set only
+        stats = self.rules.stats()
+        lines += [
+            f"# HELP {prefix}_rules_info Rule set in use.",
+            f"# TYPE {prefix}_rules_info gauge",
+            f'{prefix}_rules_info{{version="{stats["version"]}",digest="{stats["digest"]}"}} 1',
+            f"# TYPE {prefix}_rules_compile_seconds gauge",
+            f"{prefix}_rules_compile_seconds {stats['compile_seconds']}",
+            f"# TYPE {prefix}_rules_reloads_total counter",
+            f"{prefix}_rules_reloads_total {stats['reloads']}",
+            f"# TYPE {prefix}_rules_descriptions_total counter",
+            f"{prefix}_rules_descriptions_total {stats['descriptions']}",
+            f"# TYPE {prefix}_rules_match_seconds_total counter",
+            f"{prefix}_rules_match_seconds_total {stats['match_seconds']}",
+        ]
+        text = "\n".join(lines) + "\n"
+        if profiling.active is not None:
+            text += profiling.active.to_prometheus(prefix)
+        return text
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+
+class CodingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Headers and body go out as separate writes; without TCP_NODELAY every
+    # keep-alive response waits for the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        service = self.server.service
+        try:
+            if self.path == "/health":
+                self._send_json(HTTPStatus.OK, service.health())
+            elif self.path == "/metrics":
+                self._send(HTTPStatus.OK, service.metrics().encode(), "text/plain; version=0.0.4")
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path {self.path}"})
+        except Exception:
+            self._send_internal_error()
+
+    def do_POST(self):
+        service = self.server.service
+        try:
+            if self.path == "/code":
+                description = self._read_json("description", str)
+                if not is_encodable(description):
+                    raise BadRequest('"description" contains an unpaired surrogate')
+                attributes, product_code = service.code_one(description)
+                self._send_json(HTTPStatus.OK, to_record(description, attributes, product_code))
+            elif self.path == "/code/batch":
+                descriptions = self._read_json("descriptions", list)
+                if not all(isinstance(description, str) for description in descriptions):
+                    raise BadRequest('"descriptions" must be a list of strings')
+                if not all(is_encodable(description) for description in descriptions):
+                    raise BadRequest('"descriptions" contains an unpaired surrogate')
+                results = service.code_batch(descriptions)
+                self._send_json(HTTPStatus.OK, {"results": [
+                    to_record(description, attributes, product_code)
+                    for description, (attributes, product_code) in zip(descriptions, results)
+                ]})
+            else:
+                self._discard_body()
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path {self.path}"})
+        except BadRequest as error:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        except Exception:
+            self._send_internal_error()
+
+    def _send_internal_error(self):
+        # The request body has been read by now, so the connection stays usable.
+        logger.exception("Error handling %s %s", self.command, self.path)
+        self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal server error"})
+
+    def _content_length(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            # The body cannot be skipped safely, so this connection ends here.
+            self.close_connection = True
+            raise BadRequest(f"Content-Length must be between 0 and {MAX_BODY_BYTES} bytes")
+        return length
+
+    def _read_json(self, field, kind):
+        length = self._content_length()
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise BadRequest("request body is not valid JSON") from None
+        if not isinstance(body, dict) or not isinstance(body.get(field), kind):
+            raise BadRequest(f'expected a JSON object with "{field}" ({kind.__name__})')
+        return body[field]
+
+    def _discard_body(self):
+        self.rfile.read(self._content_length())
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode(), "application/json")
+
+    def _send(self, status, body, content_type):
+        path = self.path if self.path in ENDPOINTS else "other"
+        self.server.service.count_request(path, int(status))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per request on stderr would dominate at high QPS.
+        pass
+
+
+class CodingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, CodingRequestHandler)
+        self.service = service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve product coding over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes for batches; 0 uses every core (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="descriptions per worker task (default: %(default)s)")
+    parser.add_argument("--guarded", action="store_true",
+                        help="cap length and time per description (extract_attributes_guarded)")
+    parser.add_argument("--rules", default=rules.RULES_FILE,
+                        help="rule file, reloaded when it changes (default: rules.json)")
+    parser.add_argument("--profile", action="store_true", help="export detector latency on /metrics")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable()
+    service = CodingService(args.workers or None, args.chunk_size, args.guarded, rules_file=args.rules)
+    server = CodingServer((args.host, args.port), service)
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
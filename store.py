@@ -0,0 +1,171 @@
+"""Persistent result store for incremental re-coding.
+
+Usage:
+
+    python -m store results.sqlite item_master.txt -o coded.jsonl
+
+Results are kept in SQLite under (hash of the normalized description, rules
+version), so a re-run only codes descriptions that are new or changed, and
+everything again once the rules change. The rules version is a hash of the
+rule set's digest and core.CODER_VERSION, so edits to comments or docstrings
+keep the stored results, while rule-file edits and detector changes (which bump
+CODER_VERSION) invalidate them.
+"""
+import argparse
+import hashlib
+import sqlite3
+import sys
+
+import core
+from cache import cache_key
+from compact import CompactResult, encode
+from parallel import DEFAULT_CHUNK_SIZE, chunked, code_parallel
+from streaming import WRITERS, read_lines
+
+# SQLite caps the parameters of one statement (999 before 3.32)
+LOOKUP_BATCH = 500
+
+
+def rules_version(rule_set=None, coder_version=core.CODER_VERSION):
+    """Short hash identifying the rules and detectors that produced a result."""
+    digest = hashlib.sha256(f"{coder_version}:{(rule_set or core.DEFAULT_RULES).digest}".encode())
+    return digest.hexdigest()[:16]
+
+
+def text_hash(supplier_text):
+    return hashlib.blake2b(cache_key(supplier_text).encode(), digest_size=16).digest()
+
+
+class ResultStore:
+    """SQLite map of (text hash, rules version) -> compact result."""
+
+    def __init__(self, path, version=None):
+        self.version = version or rules_version()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                text_hash BLOB NOT NULL,
+                rules_version TEXT NOT NULL,
+                attributes BLOB NOT NULL,
+                PRIMARY KEY (text_hash, rules_version)
+            ) WITHOUT ROWID
+        """)
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, descriptions):
+        """Stored ``(attributes, product_code)`` per description, None where missing."""
+        hashes = [text_hash(description) for description in descriptions]
+        found = {}
+        for start in range(0, len(hashes), LOOKUP_BATCH):
+            batch = list(set(hashes[start:start + LOOKUP_BATCH]))
+            rows = self.connection.execute(
+                f"SELECT text_hash, attributes FROM results WHERE rules_version = ? "
+                f"AND text_hash IN ({', '.join('?' * len(batch))})",
+                [self.version, *batch],
+            )
+            found.update(rows)
+        return [CompactResult(found[h]).as_result() if h in found else None for h in hashes]
+
+    def put_many(self, items):
+        """Store ``(description, (attributes, product_code))`` pairs in one transaction."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results (text_hash, rules_version, attributes) VALUES (?, ?, ?)",
+                ((text_hash(description), self.version, encode(attributes))
+                 for description, (attributes, _) in items),
+            )
+
+    def code_many(self, descriptions, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Results for ``descriptions`` in order, coding and storing only the missing ones.
+
+        Missing descriptions are coded once each, on a process pool when
+        ``workers`` is not 1.
+        """
+        descriptions = list(descriptions)
+        results = self.get_many(descriptions)
+        stored = sum(result is not None for result in results)
+        missing = list(dict.fromkeys(cache_key(description)
+                                     for description, result in zip(descriptions, results) if result is None))
+        if missing:
+            if workers == 1:
+                coded = [core.extract_attributes(description) for description in missing]
+            else:
+                coded = code_parallel(missing, workers, chunk_size)
+            self.put_many(zip(missing, coded))
+            by_key = dict(zip(missing, coded))
+            results = [by_key[cache_key(description)] if result is None else result
+                       for description, result in zip(descriptions, results)]
+        self.hits += stored
+        self.misses += len(missing)
+        return results
+
+    def iter_code(self, descriptions, batch_size=DEFAULT_CHUNK_SIZE, workers=1):
+        """Lazily yield results for a description feed, one code_many per batch."""
+        for batch in chunked(descriptions, batch_size):
+            yield from self.code_many(batch, workers, batch_size)
+
+    def prune(self):
+        """Delete results of other rule versions; returns how many were removed."""
+        with self.connection:
+            return self.connection.execute(
+                "DELETE FROM results WHERE rules_version != ?", [self.version]).rowcount
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM results WHERE rules_version = ?", [self.version]).fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code descriptions, reusing results stored by earlier runs.")
+    parser.add_argument("database", help="SQLite file of stored results (created if missing)")
+    parser.add_argument("input", nargs="?", default="-", help="text file, one description per line, or - for stdin")
+    parser.add_argument("-o", "--output", help="JSONL or CSV file to write (default: no output, only store)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes for new descriptions; 0 uses every core (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=10 * DEFAULT_CHUNK_SIZE,
+                        help="descriptions looked up and stored per transaction (default: %(default)s)")
+    parser.add_argument("--prune", action="store_true", help="delete results of older rule versions")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = open(args.output, "w", encoding="utf-8", newline="") if args.output else None
+    try:
+        with ResultStore(args.database) as store:
+            if args.prune:
+                print(f"Pruned {store.prune()} results of older rule versions", file=sys.stderr)
+            writer = None
+            if target is not None:
+                writer = WRITERS["csv" if args.output.lower().endswith(".csv") else "jsonl"](target)
+            for batch in chunked(read_lines(source), args.batch_size):
+                _code_batch(store, batch, writer, args.workers)
+            if writer is not None:
+                writer.flush()
+            print(f"{store.hits} stored, {store.misses} coded (rules {store.version})", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not None:
+            target.close()
+
+
+def _code_batch(store, descriptions, writer, workers):
+    results = store.code_many(descriptions, workers or None)
+    if writer is not None:
+        for description, (attributes, product_code) in zip(descriptions, results):
+            writer.write(description, attributes, product_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Streaming coding of unbounded description feeds (pipes, large files, queues).
+
+Usage:
+
+    python -m streaming descriptions.txt -o coded.jsonl
+    tail -f feed.txt | python -m streaming - --format csv --flush-every 1
+
+Descriptions are read one per line and coded lazily, so memory stays constant
+however long the feed is.
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+
+from core import DEFAULT_ATTRIBUTES, extract_attributes, extract_attributes_guarded
+from parallel import DEFAULT_CHUNK_SIZE, chunked, iter_code_parallel
+
+DEFAULT_FLUSH_EVERY = 100
+
+
+def read_lines(stream):
+    """Yield the non-blank lines of a text stream, without line endings."""
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            yield line
+
+
+def code_stream(descriptions, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, guarded=False, executor=None):
+    """Lazily yield ``(attributes, product_code)`` for each description, in input order.
+
+    With ``workers`` 1 (and no ``executor``) each description is coded as soon
+    as it is pulled, which suits slow feeds. Otherwise chunks are coded on a
+    process pool with a bounded number in flight, so a slow consumer holds
+    back the reader instead of letting results pile up.
+    """
+    if workers == 1 and executor is None:
+        return map(extract_attributes_guarded if guarded else extract_attributes, descriptions)
+    return iter_code_parallel(descriptions, workers, chunk_size, executor, guarded)
+
+
+def code_stream_with_text(descriptions, **kwargs):
+    """Like code_stream, yielding ``(description, attributes, product_code)``.
+
+    Only the descriptions still being coded are kept in memory.
+    """
+    pending = deque()
+
+    def feed():
+        for description in descriptions:
+            pending.append(description)
+            yield description
+
+    for attributes, product_code in code_stream(feed(), **kwargs):
+        yield pending.popleft(), attributes, product_code
+
+
+def code_batches(descriptions, batch_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """Yield lists of at most ``batch_size`` ``(description, attributes, product_code)`` records.
+
+    Useful for consumers that acknowledge or commit in batches, e.g. a
+    message queue: the next batch is only coded once the previous one has
+    been taken.
+    """
+    return chunked(code_stream_with_text(descriptions, **kwargs), batch_size)
+
+
+def to_record(description, attributes, product_code):
+    """JSON-ready record in the golden corpus format.
+
+    ``attributes`` maps each attribute to ``[label, code]``.
+    """
+    return {
+        "description": description,
+        "product_code": product_code,
+        "attributes": {attribute: list(value) for attribute, value in attributes.items()},
+    }
+
+
+class _Writer:
+    def __init__(self, file, flush_every=DEFAULT_FLUSH_EVERY):
+        self.file = file
+        self.flush_every = flush_every
+        self.count = 0
+
+    def write(self, description, attributes, product_code):
+        self._write(description, attributes, product_code)
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def write_all(self, records):
+        """Write ``(description, attributes, product_code)`` records; returns how many."""
+        for record in records:
+            self.write(*record)
+        self.file.flush()
+        return self.count
+
+    def flush(self):
+        self.file.flush()
+
+
+class JSONLWriter(_Writer):
+    """One JSON object per line, see to_record."""
+
+    def _write(self, description, attributes, product_code):
+        record = to_record(description, attributes, product_code)
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CSVWriter(_Writer):
+    """A header row, then the description, attribute labels and product code."""
+
+    def __init__(self, file, flush_every=DEFAULT_FLUSH_EVERY):
+        super().__init__(file, flush_every)
+        self._csv = csv.writer(file)
+        self._csv.writerow(["Description", *DEFAULT_ATTRIBUTES, "Product code"])
+
+    def _write(self, description, attributes, product_code):
+        self._csv.writerow([description, *(attributes[attribute][0] for attribute in DEFAULT_ATTRIBUTES),
+                            product_code])
+
+
+WRITERS = {"jsonl": JSONLWriter, "csv": CSVWriter}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code a stream of supplier descriptions, one per line.")
+    parser.add_argument("input", nargs="?", default="-", help="text file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    parser.add_argument("-f", "--format", choices=WRITERS, help="output format (default: from the extension, else jsonl)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every core (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="descriptions per worker task (default: %(default)s)")
+    parser.add_argument("--flush-every", type=int, default=DEFAULT_FLUSH_EVERY,
+                        help="flush the output every N records (default: %(default)s)")
+    parser.add_argument("--guarded", action="store_true",
+                        help="cap length and time per description (extract_attributes_guarded)")
+    args = parser.parse_args()
+
+    output_format = args.format or ("csv" if args.output and args.output.lower().endswith(".csv") else "jsonl")
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = sys.stdout if not args.output else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        records = code_stream_with_text(read_lines(source), workers=args.workers or None,
+                                        chunk_size=args.chunk_size, guarded=args.guarded)
+        WRITERS[output_format](target, args.flush_every).write_all(records)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
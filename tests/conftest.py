@@ -0,0 +1,15 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def golden_descriptions():
+    """The supplier descriptions of the golden corpus."""
+    with open(os.path.join(ROOT, "benchmarks", "golden_corpus.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line)["description"] for line in f if line.strip()]
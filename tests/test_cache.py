@@ -0,0 +1,45 @@
+import pytest
+
+from cache import ResultCache
+from core import extract_attributes
+
+DESCRIPTIONS = [
+    "Distribution transformer 630 kVA 11/0.415 kV Dyn11 ONAN Cu IEC 60076",
+    "Power Transformer 100 MVA 220/66 kV ONAN/ONAF OLTC outdoor IEC",
+    "Cast resin dry type transformer 1600 kVA 20/0.4 kV AN indoor",
+]
+
+
+def test_results_match_extract_attributes():
+    cache = ResultCache()
+    for description in DESCRIPTIONS:
+        attributes, product_code = cache.extract(description)
+        assert (dict(attributes), product_code) == extract_attributes(description)
+
+
+def test_cached_results_are_read_only():
+    cache = ResultCache()
+    attributes, _ = cache.extract(DESCRIPTIONS[0])
+    with pytest.raises(TypeError):
+        attributes["Oil/Dry"] = ("Ester Oil", "1")
+    assert cache.extract(DESCRIPTIONS[0])[0]["Oil/Dry"] == extract_attributes(DESCRIPTIONS[0])[0]["Oil/Dry"]
+
+
+def test_counters_and_lru_eviction():
+    cache = ResultCache(maxsize=2)
+    first, second, third = DESCRIPTIONS
+    cache.extract(first)
+    cache.extract(second)
+    cache.extract(f"  {first}\n")  # same key: surrounding whitespace is dropped
+    cache.extract(third)  # evicts second, the least recently used
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 3, "evictions": 1}
+    cache.extract(first)
+    cache.extract(second)
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 4
+    cache.clear()
+    assert cache.stats() == {"size": 0, "maxsize": 2, "hits": 0, "misses": 0, "evictions": 0}
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=0)
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+import code_index
+from code_index import CodeIndex, CodeIndexWriter, build_index
+from core import ATTRIBUTE_VALUES, extract_attributes
+from schema import SCHEMA
+
+QUERIES = [
+    {"Oil/Dry": "Mineral Oil"},
+    {"Tap Changer": "On Load Tap Changer", "Power in MVA": ["10 - 50 MVA", "50 - 100 MVA"]},
+    {"Primary Voltage in kV": ["> 110 - 220 kV", "> 220 kV"], "Standard": "IEC"},
+    {"Application": "Land Based"},
+    {"Power in MVA": lambda label, code: code == ""},
+    {"Product type": "Unknown", "Winding material": lambda label, code: code != "X"},
+]
+
+
+@pytest.fixture(scope="module")
+def product_codes(golden_descriptions):
+    rng = random.Random(1)
+    codes = [extract_attributes(description)[1] for description in golden_descriptions]
+    codes += [SCHEMA.encode({attribute: rng.choice(values) for attribute, values in ATTRIBUTE_VALUES.items()})
+              for _ in range(3000)]
+    rng.shuffle(codes)
+    return codes
+
+
+@pytest.fixture
+def index(tmp_path, product_codes, monkeypatch):
+    # Small buffers and query chunks, so both boundaries are crossed
+    with CodeIndexWriter(str(tmp_path), buffer_rows=1000) as writer:
+        for product_code in product_codes:
+            writer.add(product_code)
+    monkeypatch.setattr(code_index, "QUERY_CHUNK_ROWS", 700)
+    return CodeIndex(str(tmp_path))
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_query_matches_brute_force_decode(index, product_codes, query):
+    expected = [row for row, product_code in enumerate(product_codes) if SCHEMA.matches(product_code, query)]
+    assert index.query(query).tolist() == expected
+    assert index.count(query) == len(expected)
+
+
+def test_rows_read_back_as_codes(index, product_codes):
+    assert len(index) == len(product_codes)
+    assert [index.product_code(row) for row in range(len(index))] == product_codes
+
+
+def test_unknown_attribute_and_label(index):
+    with pytest.raises(KeyError):
+        index.query({"Colour": "Red"})
+    with pytest.raises(ValueError, match="unknown Oil/Dry label"):
+        index.query({"Oil/Dry": "Olive Oil"})
+
+
+def test_invalid_code_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="not a valid product code"):
+        build_index(str(tmp_path), ["4JZZ021000A0101", "4JZZ"])
+
+
+def test_empty_index(tmp_path):
+    assert build_index(str(tmp_path), []) == 0
+    index = CodeIndex(str(tmp_path))
+    assert index.query({"Oil/Dry": "Mineral Oil"}).tolist() == []
+    assert index.count({"Oil/Dry": "Mineral Oil"}) == 0
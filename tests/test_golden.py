@@ -0,0 +1,20 @@
+import json
+import os
+
+import pytest
+
+from core import extract_attributes
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "benchmarks", "golden_corpus.jsonl")
+
+with open(GOLDEN_PATH, encoding="utf-8") as f:
+    GOLDEN = [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("row", GOLDEN, ids=[row["description"][:40] for row in GOLDEN])
+def test_golden_snapshot_agreement(row):
+    """Every golden row, known issues included, codes exactly as in the snapshot."""
+    attributes, product_code = extract_attributes(row["description"])
+    assert {attribute: list(value) for attribute, value in attributes.items()} == row["attributes"]
+    assert product_code == row["product_code"]
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import extract_attributes
+from pipeline import SourceError, code_files
+
+DESCRIPTIONS = [
+    "Distribution transformer 630 kVA 11/0.415 kV Dyn11 ONAN Cu IEC 60076",
+    "Power Transformer 100 MVA 220/66 kV ONAN/ONAF OLTC outdoor IEC",
+]
+
+
+def write_sources(directory):
+    paths = {
+        "jsonl": os.path.join(directory, "export.jsonl"),
+        "csv": os.path.join(directory, "export.csv"),
+    }
+    with open(paths["jsonl"], "w", encoding="utf-8") as f:
+        f.writelines(json.dumps({"description": text}) + "\n" for text in DESCRIPTIONS)
+    with open(paths["csv"], "w", encoding="utf-8") as f:
+        f.write("description\n" + "".join(f'"{text}"\n' for text in DESCRIPTIONS))
+    return paths
+
+
+def run(sources, output_dir, output_format="jsonl"):
+    with ThreadPoolExecutor(1) as executor:
+        return asyncio.run(code_files(sources, output_dir, output_format=output_format, executor=executor))
+
+
+@pytest.mark.parametrize("output_format", ["jsonl", "csv"])
+def test_refuses_to_overwrite_source(tmp_path, output_format):
+    source = write_sources(str(tmp_path))[output_format]
+    with open(source, encoding="utf-8") as f:
+        before = f.read()
+    with pytest.raises(ValueError, match="would overwrite source"):
+        run([source], str(tmp_path), output_format)
+    with open(source, encoding="utf-8") as f:
+        assert f.read() == before
+
+
+def test_refuses_source_reached_through_symlink(tmp_path):
+    source = write_sources(str(tmp_path))["jsonl"]
+    link = tmp_path / "link"
+    link.symlink_to(tmp_path, target_is_directory=True)
+    with pytest.raises(ValueError, match="would overwrite source"):
+        run([source], str(link))
+
+
+def test_codes_next_to_source_in_another_format(tmp_path):
+    source = write_sources(str(tmp_path))["jsonl"]
+    assert run([source], str(tmp_path), "csv") == {source: len(DESCRIPTIONS)}
+
+
+def test_codes_into_output_dir(tmp_path):
+    source = write_sources(str(tmp_path))["jsonl"]
+    output_dir = str(tmp_path / "coded")
+    assert run([source], output_dir) == {source: len(DESCRIPTIONS)}
+    with open(os.path.join(output_dir, "export.jsonl"), encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["product_code"] for record in records] == [extract_attributes(text)[1] for text in DESCRIPTIONS]
+
+
+def test_missing_csv_column_names_source_and_leaves_no_output(tmp_path):
+    source = write_sources(str(tmp_path))["csv"]
+    output_dir = tmp_path / "coded"
+    with ThreadPoolExecutor(1) as executor:
+        with pytest.raises(SourceError, match=r"export\.csv: no column 'Desc'"):
+            asyncio.run(code_files([source], str(output_dir), column="Desc", executor=executor))
+    assert list(output_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize("line, message", [
+    ("[1, 2]", "export.jsonl:2: expected a JSON object or string, got list"),
+    ("{bad", "export.jsonl:2: invalid JSON"),
+])
+def test_malformed_jsonl_line_fails_only_its_source(tmp_path, line, message):
+    source = str(tmp_path / "export.jsonl")
+    with open(source, "w", encoding="utf-8") as f:
+        f.write(json.dumps(DESCRIPTIONS[0]) + "\n" + line + "\n")
+    other = str(tmp_path / "other.txt")
+    with open(other, "w", encoding="utf-8") as f:
+        f.write("\n".join(DESCRIPTIONS) + "\n")
+    output_dir = tmp_path / "coded"
+    with pytest.raises(SourceError, match=message):
+        run([source, other], str(output_dir))
+    assert sorted(path.name for path in output_dir.iterdir()) == ["other.jsonl"]
+    assert len((output_dir / "other.jsonl").read_text(encoding="utf-8").splitlines()) == len(DESCRIPTIONS)
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+import rules
+from core import extract_attributes
+
+DESCRIPTION = "Distribution transformer 630 kVA 11/0.4 kV Dyn11 ONAN Cu IEC 60076"
+
+
+@pytest.fixture
+def data():
+    with open(rules.RULES_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    return str(path)
+
+
+def broken(data, change):
+    change(data["attributes"])
+    return data
+
+
+INCOMPLETE = {
+    "missing fallback": lambda a: a["Tap Changer"].pop("fallback"),
+    "one-item value": lambda a: a["Product type"]["rules"][0].update(value=["02-Transformer"]),
+    "non-string code": lambda a: a["Application"].update(fallback=["Land based", 0]),
+    "default unit without divisor": lambda a: a["Power in MVA"]["unit_divisors"].pop("kva"),
+    "empty voltage ranges": lambda a: a["Primary Voltage in kV"].update(ranges=[]),
+    "unsorted power ranges": lambda a: a["Power in MVA"]["ranges"].reverse(),
+    "unknown converter": lambda a: a["Primary Voltage in kV"]["rules"][0].update(converter="mv"),
+}
+
+
+def fails_on_coding(attributes):
+    # Compiles, but the exponent converter needs groups the pattern does not have
+    attributes["Primary Voltage in kV"]["rules"].insert(0, {"pattern": r"(\d+) kV", "converter": "exponent"})
+
+
+def test_rule_file_codes_like_default_rules():
+    assert extract_attributes(DESCRIPTION, rules.load_rules(rules.RULES_FILE)) == extract_attributes(DESCRIPTION)
+
+
+def test_unparsable_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text('{"version": 1, "attributes": {', encoding="utf-8")
+    with pytest.raises(ValueError, match="invalid rule file"):
+        rules.load_rules(str(path))
+
+
+@pytest.mark.parametrize("change", INCOMPLETE.values(), ids=INCOMPLETE.keys())
+def test_incomplete_file(tmp_path, data, change):
+    with pytest.raises(ValueError, match="invalid rule file"):
+        rules.load_rules(write(tmp_path / "rules.json", broken(data, change)))
+
+
+def test_check_rules_codes_smoke_descriptions(tmp_path, data):
+    rule_set = rules.load_rules(write(tmp_path / "rules.json", broken(data, fails_on_coding)))
+    with pytest.raises(ValueError, match="IndexError"):
+        rules.check_rules(rule_set)
+    assert rule_set.descriptions == 0
+
+
+@pytest.mark.parametrize("change", [*INCOMPLETE.values(), fails_on_coding])
+def test_reload_keeps_previous_rules(tmp_path, data, change):
+    path = write(tmp_path / "rules.json", data)
+    engine = rules.RuleEngine(path, check_interval=0)
+    before = engine.current()
+    write(path, broken(data, change))
+    assert engine.reload() is False
+    assert engine.current() is before
+    assert engine.last_error.startswith("invalid rule file")
+    assert extract_attributes(DESCRIPTION, engine.current()) == extract_attributes(DESCRIPTION)
+
+
+def test_reload_swaps_changed_rules(tmp_path, data):
+    path = write(tmp_path / "rules.json", data)
+    engine = rules.RuleEngine(path, check_interval=0)
+    before = engine.current()
+    data["attributes"]["Application"]["fallback"] = ["Onshore", "0"]
+    write(path, data)
+    after = engine.current()
+    assert after is not before and engine.reloads == 1 and engine.last_error is None
+    assert extract_attributes(DESCRIPTION, after)[0]["Application"] == ("Onshore", "0")
+    assert extract_attributes(DESCRIPTION, before)[0]["Application"] == ("Land based", "0")
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from core import ATTRIBUTE_VALUES, DEFAULT_ATTRIBUTES, extract_attributes
+from schema import SCHEMA
+
+
+def random_attributes(rng):
+    return {attribute: rng.choice(values) for attribute, values in ATTRIBUTE_VALUES.items()}
+
+
+def decoded(attributes):
+    """``attributes`` as decode returns them: the last value with each code."""
+    return {attribute: SCHEMA.segments[attribute].by_code[code] for attribute, (_, code) in attributes.items()}
+
+
+def test_decode_extracted_codes(golden_descriptions):
+    for description in golden_descriptions:
+        attributes, product_code = extract_attributes(description)
+        assert SCHEMA.decode(product_code) == decoded(attributes)
+        assert SCHEMA.encode(attributes) == product_code
+
+
+def test_round_trip_every_segment_combination():
+    rng = random.Random(0)
+    for _ in range(2000):
+        attributes = random_attributes(rng)
+        product_code = SCHEMA.encode(attributes)
+        assert SCHEMA.is_valid(product_code)
+        assert SCHEMA.decode(product_code) == decoded(attributes)
+
+
+def test_empty_power_segment_and_unknown_product_type():
+    attributes = dict(DEFAULT_ATTRIBUTES)
+    attributes.update({"Power in MVA": ("Unknown", ""), "Primary Voltage in kV": ("< 36 kV", "0")})
+    product_code = SCHEMA.encode(attributes)
+    assert product_code == "4JZZX000AX10X"
+    decoded_attributes = SCHEMA.decode(product_code)
+    assert decoded_attributes["Product type"] == ("Unknown", "X")
+    assert decoded_attributes["Power in MVA"] == ("Unknown", "")
+    assert decoded_attributes["Primary Voltage in kV"] == ("< 36 kV", "0")
+    # One character longer with a power range, and parsed accordingly
+    with_power = SCHEMA.encode(dict(attributes, **{"Power in MVA": ("1 - 10 MVA", "1")}))
+    assert len(with_power) == len(product_code) + 1
+    assert SCHEMA.decode(with_power)["Power in MVA"] == ("1 - 10 MVA", "1")
+
+
+def test_land_based_labels_share_a_code():
+    application = SCHEMA.segments["Application"]
+    assert application.by_code["0"] == ("Land based", "0")
+    assert application.codes_matching("Land Based") == application.codes_matching("Land based") == {"0"}
+    assert SCHEMA.decode(SCHEMA.encode(DEFAULT_ATTRIBUTES))["Application"] == ("Land based", "0")
+
+
+@pytest.mark.parametrize("product_code", ["", "4JZZ", "5JZZ021000A0101", "4JZZ021000A01011", "4JZZ021000Z0101"])
+def test_invalid_codes(product_code):
+    assert not SCHEMA.is_valid(product_code)
+    with pytest.raises(ValueError, match="not a valid product code"):
+        SCHEMA.decode(product_code)
+
+
+def test_matches_and_unknown_labels():
+    product_code = extract_attributes("Power Transformer 100 MVA 220/66 kV ONAN/ONAF OLTC outdoor IEC")[1]
+    assert SCHEMA.matches(product_code, {"Tap Changer": "On Load Tap Changer", "Power in MVA": ["100 - 250 MVA"]})
+    assert not SCHEMA.matches(product_code, {"Oil/Dry": "Ester Oil"})
+    assert SCHEMA.matches(product_code, {"Standard": lambda label, code: code in "01"})
+    with pytest.raises(ValueError, match="unknown Oil/Dry label"):
+        SCHEMA.matches(product_code, {"Oil/Dry": "Olive Oil"})
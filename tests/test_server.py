@@ -0,0 +1,71 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from core import extract_attributes
+from server import CodingServer, CodingService
+
+DESCRIPTION = "Distribution transformer 630 kVA 11/0.415 kV Dyn11 ONAN Cu IEC 60076"
+
+
+@pytest.fixture
+def server():
+    service = CodingService(workers=1)
+    server = CodingServer(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+@pytest.fixture
+def connection(server):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+    yield connection
+    connection.close()
+
+
+def post(connection, path, body):
+    # json.dumps escapes lone surrogates, as a client's JSON encoder would
+    connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def requests_total(connection, path, status):
+    connection.request("GET", "/metrics")
+    metrics = connection.getresponse().read().decode()
+    line = f'transformer_coder_requests_total{{path="{path}",status="{status}"}} '
+    return next((int(row[len(line):]) for row in metrics.splitlines() if row.startswith(line)), 0)
+
+
+def test_code(connection):
+    status, record = post(connection, "/code", {"description": DESCRIPTION})
+    assert status == 200
+    assert record["product_code"] == extract_attributes(DESCRIPTION)[1]
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/code", {"description": "Trafo \ud800 11 kV"}),
+    ("/code/batch", {"descriptions": [DESCRIPTION, "Trafo \udc00 11 kV"]}),
+])
+def test_unpaired_surrogate_is_bad_request(connection, path, body):
+    status, response = post(connection, path, body)
+    assert status == 400 and "surrogate" in response["error"]
+    # Same keep-alive connection still answers
+    assert post(connection, "/code", {"description": DESCRIPTION})[0] == 200
+    assert requests_total(connection, path, 400) == 1
+
+
+def test_unexpected_error_is_counted_internal_error(server, connection, monkeypatch):
+    def fail(description):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server.service, "code_one", fail)
+    status, response = post(connection, "/code", {"description": DESCRIPTION})
+    assert status == 500 and response == {"error": "internal server error"}
+    assert requests_total(connection, "/code", 500) == 1
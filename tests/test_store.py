@@ -0,0 +1,44 @@
+import json
+
+import core
+import rules
+from core import extract_attributes
+from store import ResultStore, rules_version
+
+
+def test_round_trip_and_reuse(tmp_path, golden_descriptions):
+    path = str(tmp_path / "results.sqlite")
+    descriptions = golden_descriptions + golden_descriptions[:10] + [f"  {golden_descriptions[0]}  "]
+    distinct = len({description.strip() for description in descriptions})
+    with ResultStore(path) as store:
+        results = store.code_many(descriptions)
+        assert store.misses == distinct and store.hits == 0
+    assert results == [extract_attributes(description.strip()) for description in descriptions]
+
+    with ResultStore(path) as store:
+        assert store.code_many(descriptions) == results
+        assert store.hits == len(descriptions) and store.misses == 0
+        assert len(store) == distinct
+
+
+def test_other_rules_version_codes_again_and_prune(tmp_path, golden_descriptions):
+    path = str(tmp_path / "results.sqlite")
+    with ResultStore(path, version="old") as store:
+        store.code_many(golden_descriptions)
+    with ResultStore(path) as store:
+        store.code_many(golden_descriptions[:5])
+        assert store.hits == 0 and store.misses == 5
+        assert store.prune() == len({description.strip() for description in golden_descriptions})
+    with ResultStore(path, version="old") as store:
+        assert len(store) == 0
+
+
+def test_rules_version_follows_rules_and_coder_version(tmp_path):
+    with open(rules.RULES_FILE, encoding="utf-8") as f:
+        data = json.load(f)
+    assert rules_version(rules.load_rules(rules.RULES_FILE)) == rules_version()
+    data["attributes"]["Application"]["fallback"] = ["Onshore", "0"]
+    changed = tmp_path / "rules.json"
+    changed.write_text(json.dumps(data), encoding="utf-8")
+    assert rules_version(rules.load_rules(str(changed))) != rules_version()
+    assert rules_version(coder_version=core.CODER_VERSION + 1) != rules_version()